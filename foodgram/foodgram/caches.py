@@ -0,0 +1,9 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+PROCESS_LOCAL_BACKENDS = (DummyCache, LocMemCache)
+
+
+def is_shared_cache(alias):
+    return not isinstance(caches[alias], PROCESS_LOCAL_BACKENDS)
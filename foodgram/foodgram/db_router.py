@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import (DEFAULT_DB_ALIAS, DatabaseError, InterfaceError,
+                       OperationalError, connections)
+from rest_framework.permissions import SAFE_METHODS
+
+from .caches import is_shared_cache
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_APPS = ('authtoken', 'sessions')
+
+current_state = ContextVar('replica_state', default=None)
+
+
+class ReplicaState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.alias = None
+        self.wrote = False
+
+
+class ReplicaPool:
+    def __init__(self, weights, check_interval=5, max_lag=None):
+        self.weights = weights
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self.current = dict.fromkeys(weights, 0)
+        self.unhealthy_until = dict.fromkeys(weights, 0)
+        self.checked = dict.fromkeys(weights, 0)
+        self.lock = threading.Lock()
+
+    def __contains__(self, alias):
+        return alias in self.weights
+
+    def mark_unhealthy(self, alias):
+        logger.warning('Реплика %s недоступна, чтение идёт с основной базы',
+                       alias)
+        self.unhealthy_until[alias] = time.monotonic() + self.check_interval
+
+    def get_lag(self, alias):
+        connection = connections[alias]
+        if connection.vendor != 'postgresql':
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT EXTRACT(EPOCH FROM now() - '
+                           'pg_last_xact_replay_timestamp())')
+            lag = cursor.fetchone()[0]
+        return lag or 0
+
+    def check(self, alias):
+        try:
+            connections[alias].ensure_connection()
+            if self.max_lag is not None and (
+                    self.get_lag(alias) > self.max_lag):
+                raise DatabaseError('Отставание реплики слишком большое')
+        except DatabaseError:
+            self.mark_unhealthy(alias)
+            return False
+        return True
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        if now < self.unhealthy_until[alias]:
+            return False
+        if now - self.checked[alias] < self.check_interval:
+            return True
+        self.checked[alias] = now
+        return self.check(alias)
+
+    def choose(self):
+        healthy = [alias for alias in self.weights if self.is_healthy(alias)]
+        if not healthy:
+            return None
+        with self.lock:
+            for alias in healthy:
+                self.current[alias] += self.weights[alias]
+            alias = max(healthy, key=self.current.get)
+            self.current[alias] -= sum(self.weights[name] for name in healthy)
+        return alias
+
+
+replicas = ReplicaPool(settings.DATABASE_REPLICAS,
+                       settings.REPLICA_CHECK_INTERVAL,
+                       settings.REPLICA_MAX_LAG)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = current_state.get()
+        if (state is None or not state.use_replica or state.wrote
+                or model._meta.app_label in PRIMARY_APPS):
+            return DEFAULT_DB_ALIAS
+        if state.alias is None:
+            state.alias = replicas.choose() or DEFAULT_DB_ALIAS
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = current_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+def get_pin_key(request):
+    identity = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME)
+    if not identity:
+        return None
+    return 'replica-pin:' + hashlib.sha1(identity.encode()).hexdigest()
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        if not is_shared_cache(settings.REPLICA_PIN_CACHE):
+            raise ImproperlyConfigured(
+                f'REPLICA_PIN_CACHE={settings.REPLICA_PIN_CACHE!r} должен '
+                'быть общим для всех воркеров кэшем, а не кэшем процесса')
+        self.get_response = get_response
+        self.cache = caches[settings.REPLICA_PIN_CACHE]
+
+    def __call__(self, request):
+        key = get_pin_key(request)
+        use_replica = request.method in SAFE_METHODS and not (
+            key and self.cache.get(key))
+        state = ReplicaState(use_replica)
+        token = current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_state.reset(token)
+        if state.wrote and key:
+            self.cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        method = request.method.lower()
+        action = (getattr(view_func, 'actions', None) or {}).get(
+            method, method)
+        if action in getattr(view_class, 'primary_db_actions', ()):
+            current_state.get().use_replica = False
+
+    def process_exception(self, request, exception):
+        state = current_state.get()
+        if (isinstance(exception, (OperationalError, InterfaceError))
+                and state.alias in replicas):
+            replicas.mark_unhealthy(state.alias)
@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .timing import track_request, track_view
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def sample_sort_key(item):
+    (name, labels), value = item
+    bound = dict(labels).get('le')
+    return (name, tuple(label for label in labels if label[0] != 'le'),
+            float(bound) if bound is not None else 0)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def labels_key(self, labels):
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def inc(self, amount=1, **labels):
+        self.registry.add(self.name, self.labels_key(labels), amount)
+
+
+class Histogram(Counter):
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(),
+                 buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self.labels_key(labels)
+        bucket_name = f'{self.name}_bucket'
+        for bound in self.buckets:
+            self.registry.add(bucket_name,
+                              key + (('le', format_value(bound)),),
+                              int(value <= bound))
+        self.registry.add(f'{self.name}_sum', key, value)
+        self.registry.add(f'{self.name}_count', key, 1)
+
+
+class MetricsRegistry:
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.metrics = {}
+        self.samples = defaultdict(float)
+        self.lock = threading.Lock()
+        self.pid = None
+        self.flushed = 0.0
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(),
+                  buckets=LATENCY_BUCKETS):
+        return self.register(
+            Histogram(self, name, documentation, labelnames, buckets))
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def get_path(self, pid):
+        return os.path.join(self.directory, f'metrics_{pid}.json')
+
+    def read_file(self, path):
+        try:
+            with open(path) as file:
+                rows = json.load(file)
+        except (OSError, ValueError):
+            return []
+        return [(name, tuple(map(tuple, labels)), value)
+                for name, labels, value in rows]
+
+    def check_process(self):
+        pid = os.getpid()
+        if self.pid == pid:
+            return
+        self.pid = pid
+        self.samples.clear()
+        if self.directory:
+            for name, labels, value in self.read_file(self.get_path(pid)):
+                self.samples[name, labels] += value
+
+    def add(self, name, labels, amount):
+        with self.lock:
+            self.check_process()
+            self.samples[name, labels] += amount
+
+    def flush(self, force=False):
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.flushed < self.flush_interval:
+            return
+        with self.lock:
+            self.check_process()
+            self.flushed = now
+            rows = [[name, labels, value]
+                    for (name, labels), value in self.samples.items()]
+            path = self.get_path(self.pid)
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(rows, file)
+        os.replace(temp_path, path)
+
+    def collect(self):
+        with self.lock:
+            self.check_process()
+            samples = defaultdict(float, self.samples)
+        if self.directory and os.path.isdir(self.directory):
+            own_path = self.get_path(self.pid)
+            for filename in os.listdir(self.directory):
+                path = os.path.join(self.directory, filename)
+                if not filename.endswith('.json') or path == own_path:
+                    continue
+                for name, labels, value in self.read_file(path):
+                    samples[name, labels] += value
+        return samples
+
+    def render(self):
+        families = defaultdict(list)
+        for (name, labels), value in sorted(self.collect().items(),
+                                            key=sample_sort_key):
+            family = name
+            for suffix in ('_bucket', '_sum', '_count'):
+                if name.endswith(suffix) and name[:-len(suffix)] in (
+                        self.metrics):
+                    family = name[:-len(suffix)]
+            families[family].append((name, labels, value))
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for sample_name, labels, value in families[name]:
+                lines.append('{}{} {}'.format(
+                    sample_name, format_labels(labels), format_value(value)))
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry(settings.METRICS_DIR)
+
+requests_total = registry.counter(
+    'foodgram_requests_total', 'Number of handled requests.',
+    ('view', 'method', 'status'))
+request_duration = registry.histogram(
+    'foodgram_request_duration_seconds', 'Request latency in seconds.',
+    ('view',))
+request_queries = registry.histogram(
+    'foodgram_request_queries', 'SQL queries executed per request.',
+    ('view',), QUERY_BUCKETS)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with track_request() as timings:
+            response = self.get_response(request)
+            queries = timings.sql_count
+        view = timings.view or 'unresolved'
+        requests_total.inc(view=view, method=request.method,
+                           status=response.status_code)
+        request_duration.observe(time.perf_counter() - started, view=view)
+        request_queries.observe(queries, view=view)
+        registry.flush()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        track_view(request, view_func)
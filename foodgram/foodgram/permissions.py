@@ -0,0 +1,13 @@
+from hmac import compare_digest
+
+from django.conf import settings
+from rest_framework import permissions
+
+
+class HasMetricsAccess(permissions.BasePermission):
+    def has_permission(self, request, view):
+        if request.user.is_authenticated and request.user.is_staff:
+            return True
+        token = settings.METRICS_TOKEN
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        return bool(token) and compare_digest(header, f'Bearer {token}')
@@ -28,6 +28,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'foodgram.db_router.ReplicaMiddleware',
+    'foodgram.timing.TimingMiddleware',
+    'foodgram.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +73,53 @@ DATABASES = {
     }
 }
 
+DATABASE_REPLICAS = {}
+
+for number, replica in enumerate(
+        filter(None, os.environ.get('DB_REPLICAS', '').split(','))):
+    location, _, weight = replica.strip().partition('@')
+    alias = f'replica_{number}'
+    if 'sqlite3' in (DATABASES['default']['ENGINE'] or ''):
+        replica_settings = {'NAME': location}
+    else:
+        host, _, port = location.partition(':')
+        replica_settings = {'HOST': host, 'PORT': port or DATABASES['default']['PORT']}
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        **replica_settings,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS[alias] = int(weight or 1)
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['foodgram.db_router.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+REPLICA_PIN_CACHE = os.environ.get('REPLICA_PIN_CACHE', 'recipes')
+REPLICA_CHECK_INTERVAL = int(os.environ.get('REPLICA_CHECK_INTERVAL', 5))
+REPLICA_MAX_LAG = os.environ.get('REPLICA_MAX_LAG')
+if REPLICA_MAX_LAG is not None:
+    REPLICA_MAX_LAG = float(REPLICA_MAX_LAG)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'recipes': {
+        'BACKEND': os.environ.get(
+            'RECIPES_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('RECIPES_CACHE_LOCATION', 'recipes'),
+    },
+}
+
+RECIPES_CACHE_TTL = int(os.environ.get('RECIPES_CACHE_TTL', 10))
+
+AUTH_TOKEN_CACHE = os.environ.get('AUTH_TOKEN_CACHE', 'recipes')
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 10000))
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 300))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -118,13 +168,68 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'foodgram.timing.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 6
 }
 
+BULK_MAX_IDS = int(os.environ.get('BULK_MAX_IDS', 100))
+
+INGREDIENTS_SEARCH_LIMIT = int(
+    os.environ.get('INGREDIENTS_SEARCH_LIMIT', 50))
+
+CATALOG_MAX_AGE = int(os.environ.get('CATALOG_MAX_AGE', 300))
+
+SEARCH_CONFIG = os.environ.get('SEARCH_CONFIG', 'russian')
+
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+IMAGE_QUALITY = 80
+RECIPE_THUMBNAIL_SIZE = (480, 320)
+RECIPE_IMAGE_MAX_SIZE = 15 * 1024 * 1024
+RECIPE_IMAGE_MAX_PIXELS = 40_000_000
+
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', 2))
+EXPORT_PDF_FONT = os.environ.get(
+    'EXPORT_PDF_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+
+PERFORMANCE_TIMING = os.environ.get('PERFORMANCE_TIMING', 'False') == 'True'
+PERFORMANCE_SAMPLE_RATE = float(
+    os.environ.get('PERFORMANCE_SAMPLE_RATE', 0))
+PERFORMANCE_LOG_FILE = os.environ.get('PERFORMANCE_LOG_FILE')
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'False') == 'True'
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+if PERFORMANCE_LOG_FILE:
+    LOGGING = {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'formatters': {
+            'raw': {'format': '%(message)s'},
+        },
+        'handlers': {
+            'timing': {
+                'class': 'logging.FileHandler',
+                'filename': PERFORMANCE_LOG_FILE,
+                'formatter': 'raw',
+            },
+        },
+        'loggers': {
+            'foodgram.timing': {
+                'handlers': ['timing'],
+                'level': 'INFO',
+                'propagate': False,
+            },
+        },
+    }
+
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
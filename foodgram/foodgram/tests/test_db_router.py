@@ -0,0 +1,215 @@
+import tempfile
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.test import (SimpleTestCase, TransactionTestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from foodgram import db_router
+from foodgram.caches import is_shared_cache
+from foodgram.db_router import (ReplicaMiddleware, ReplicaPool,
+                                ReplicaRouter, ReplicaState, current_state,
+                                get_pin_key)
+from recipes.models import Recipe
+from recipes.tests.base import create_user
+from rest_framework.authtoken.models import Token
+
+REPLICA = next(iter(settings.DATABASE_REPLICAS), None)
+
+
+class SharedCacheMixin:
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(CACHES={
+            **settings.CACHES,
+            'local': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'dummy': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+            },
+            'shared': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': directory.name,
+            },
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class ReplicaPinCacheTests(SharedCacheMixin, SimpleTestCase):
+    def test_is_shared_cache(self):
+        self.assertFalse(is_shared_cache('local'))
+        self.assertFalse(is_shared_cache('dummy'))
+        self.assertTrue(is_shared_cache('shared'))
+
+    def test_replicas_require_shared_cache(self):
+        for alias in ('local', 'dummy'):
+            with self.subTest(alias=alias), override_settings(
+                    DATABASE_REPLICAS={'replica': 1},
+                    REPLICA_PIN_CACHE=alias):
+                with self.assertRaises(ImproperlyConfigured):
+                    ReplicaMiddleware(lambda request: None)
+        with override_settings(DATABASE_REPLICAS={'replica': 1},
+                               REPLICA_PIN_CACHE='shared'):
+            ReplicaMiddleware(lambda request: None)
+
+    def test_disabled_without_replicas(self):
+        with override_settings(DATABASE_REPLICAS={},
+                               REPLICA_PIN_CACHE='local'):
+            with self.assertRaises(MiddlewareNotUsed):
+                ReplicaMiddleware(lambda request: None)
+
+
+class ReplicaPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = ReplicaPool({'first': 3, 'second': 1}, check_interval=60)
+        patcher = mock.patch.object(self.pool, 'check', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_choose_weighted_round_robin(self):
+        self.assertEqual(
+            [self.pool.choose() for _ in range(8)],
+            ['first', 'first', 'second', 'first'] * 2,
+        )
+
+    def test_choose_skips_unhealthy(self):
+        with self.assertLogs('foodgram.db_router', 'WARNING'):
+            self.pool.mark_unhealthy('first')
+        self.assertEqual({self.pool.choose() for _ in range(4)}, {'second'})
+        with self.assertLogs('foodgram.db_router', 'WARNING'):
+            self.pool.mark_unhealthy('second')
+        self.assertIsNone(self.pool.choose())
+
+    def test_failed_check_marks_unhealthy(self):
+        pool = ReplicaPool({'first': 1}, check_interval=60)
+        with mock.patch.object(db_router, 'connections') as connections:
+            connections.__getitem__.return_value.ensure_connection \
+                .side_effect = OperationalError
+            with self.assertLogs('foodgram.db_router', 'WARNING'):
+                self.assertIsNone(pool.choose())
+        self.assertFalse(pool.is_healthy('first'))
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = ReplicaPool({'replica': 1}, check_interval=60)
+        self.pool.checked['replica'] = float('inf')
+        patcher = mock.patch.object(db_router, 'replicas', self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = ReplicaRouter()
+
+    def read_with(self, state, model=Recipe):
+        token = current_state.set(state)
+        try:
+            return self.router.db_for_read(model)
+        finally:
+            current_state.reset(token)
+
+    def test_reads_use_replica(self):
+        self.assertEqual(self.read_with(ReplicaState(True)), 'replica')
+        self.assertEqual(self.read_with(ReplicaState(False)),
+                         DEFAULT_DB_ALIAS)
+        self.assertEqual(self.read_with(None), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.read_with(ReplicaState(True), Token),
+                         DEFAULT_DB_ALIAS)
+
+    def test_reads_after_write_use_primary(self):
+        state = ReplicaState(True)
+        token = current_state.set(state)
+        try:
+            self.router.db_for_write(Recipe)
+            self.assertEqual(self.router.db_for_read(Recipe),
+                             DEFAULT_DB_ALIAS)
+        finally:
+            current_state.reset(token)
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        with self.assertLogs('foodgram.db_router', 'WARNING'):
+            self.pool.mark_unhealthy('replica')
+        self.assertEqual(self.read_with(ReplicaState(True)),
+                         DEFAULT_DB_ALIAS)
+
+    def test_database_error_marks_replica_unhealthy(self):
+        state = ReplicaState(True)
+        state.alias = 'replica'
+        token = current_state.set(state)
+        try:
+            with self.assertLogs('foodgram.db_router', 'WARNING'):
+                ReplicaMiddleware.process_exception(
+                    None, None, OperationalError())
+        finally:
+            current_state.reset(token)
+        self.assertFalse(self.pool.is_healthy('replica'))
+
+
+@skipUnless(REPLICA, 'DB_REPLICAS не задан')
+@override_settings(REPLICA_PIN_CACHE='shared')
+class ReplicaRoutingTests(SharedCacheMixin, TransactionTestCase):
+    databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        super().setUp()
+        pool = ReplicaPool({REPLICA: 1}, check_interval=60)
+        patcher = mock.patch.object(db_router, 'replicas', pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        caches['recipes'].clear()
+        self.user = create_user('user')
+        self.author = create_user('author')
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+
+    def get_queries(self, method, url, **extra):
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary, \
+                CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = getattr(self.client, method)(url, **extra)
+        return response, len(primary), len(replica)
+
+    def test_safe_requests_read_from_replica(self):
+        response, primary, replica = self.get_queries('get', '/api/recipes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_write_pins_reads_to_primary(self):
+        response, _, replica = self.get_queries(
+            'post', '/api/users/subscribe/',
+            data={'ids': [self.author.id]}, content_type='application/json',
+            **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica, 0)
+        request = mock.Mock(META=self.auth, COOKIES={})
+        self.assertTrue(caches['shared'].get(get_pin_key(request)))
+
+        _, primary, replica = self.get_queries(
+            'get', '/api/recipes/', **self.auth)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        _, primary, replica = self.get_queries('get', '/api/recipes/')
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_primary_db_actions(self):
+        response, primary, replica = self.get_queries(
+            'get', f'/api/users/{self.author.id}/subscribe/', **self.auth)
+        self.assertEqual(response.status_code, 201)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        with self.assertLogs('foodgram.db_router', 'WARNING'):
+            db_router.replicas.mark_unhealthy(REPLICA)
+        response, primary, replica = self.get_queries('get', '/api/recipes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from foodgram.metrics import CONTENT_TYPE, MetricsRegistry, registry
+from recipes.tests.base import FoodgramTestCase, create_user
+from rest_framework.test import APIClient
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = MetricsRegistry()
+        histogram = metrics.histogram('latency', 'Latency.', ('view',),
+                                      buckets=(0.1, 0.01, 1))
+        for value in (0.003, 0.03, 0.05, 7):
+            histogram.observe(value, view='list')
+        samples = metrics.collect()
+        view = (('view', 'list'),)
+        self.assertEqual(
+            [samples['latency_bucket', view + (('le', bound),)]
+             for bound in ('0.01', '0.1', '1', '+Inf')],
+            [1, 3, 3, 4])
+        self.assertEqual(samples['latency_count', view], 4)
+        self.assertAlmostEqual(samples['latency_sum', view], 7.083)
+
+    def test_render(self):
+        metrics = MetricsRegistry()
+        counter = metrics.counter('requests_total', 'Requests.',
+                                  ('view', 'status'))
+        histogram = metrics.histogram('queries', 'Queries.', buckets=(1, 5))
+        counter.inc(view='a"b\\c', status=200)
+        counter.inc(2, view='list', status=404)
+        histogram.observe(3)
+        self.assertEqual(metrics.render(), '\n'.join((
+            '# HELP requests_total Requests.',
+            '# TYPE requests_total counter',
+            'requests_total{view="a\\"b\\\\c",status="200"} 1',
+            'requests_total{view="list",status="404"} 2',
+            '# HELP queries Queries.',
+            '# TYPE queries histogram',
+            'queries_bucket{le="1"} 0',
+            'queries_bucket{le="5"} 1',
+            'queries_bucket{le="+Inf"} 1',
+            'queries_count 1',
+            'queries_sum 3',
+        )) + '\n')
+
+    def test_processes_are_merged(self):
+        metrics = MetricsRegistry(self.directory)
+        counter = metrics.counter('requests_total', 'Requests.', ('view',))
+        counter.inc(view='list')
+        metrics.flush(force=True)
+        with mock.patch('foodgram.metrics.os.getpid', return_value=1):
+            other = MetricsRegistry(self.directory)
+            other.counter('requests_total', 'Requests.',
+                          ('view',)).inc(2, view='list')
+            other.flush(force=True)
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['metrics_1.json', f'metrics_{os.getpid()}.json'])
+        counter.inc(view='list')
+        self.assertEqual(
+            metrics.collect()['requests_total', (('view', 'list'),)], 4)
+        self.assertIn('requests_total{view="list"} 4', metrics.render())
+
+    def test_restarted_process_keeps_its_totals(self):
+        metrics = MetricsRegistry(self.directory)
+        metrics.counter('hits', 'Hits.').inc(3)
+        metrics.flush(force=True)
+        restarted = MetricsRegistry(self.directory)
+        restarted.counter('hits', 'Hits.').inc()
+        self.assertEqual(restarted.collect()['hits', ()], 4)
+
+    def test_flush_interval(self):
+        metrics = MetricsRegistry(self.directory, flush_interval=60)
+        metrics.counter('hits', 'Hits.').inc()
+        metrics.flush(force=True)
+        metrics.counter('hits', 'Hits.').inc()
+        metrics.flush()
+        path = metrics.get_path(os.getpid())
+        self.assertEqual(metrics.read_file(path), [('hits', (), 1)])
+
+
+class MetricsEndpointTests(FoodgramTestCase):
+    def test_anonymous_is_rejected(self):
+        response = self.anonymous.get('/api/metrics')
+        self.assertEqual(response.status_code, 401)
+
+    def test_non_staff_is_rejected(self):
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 403)
+
+    def test_staff(self):
+        self.client.force_authenticate(create_user('staff', is_staff=True))
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], CONTENT_TYPE)
+        self.assertIn(b'# TYPE foodgram_requests_total counter',
+                      response.content)
+
+    def test_bearer_token(self):
+        with override_settings(METRICS_TOKEN='secret'):
+            response = self.anonymous.get(
+                '/api/metrics', HTTP_AUTHORIZATION='Bearer secret')
+            self.assertEqual(response.status_code, 200)
+            response = self.anonymous.get(
+                '/api/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+            self.assertEqual(response.status_code, 401)
+        with override_settings(METRICS_TOKEN=None):
+            response = self.anonymous.get('/api/metrics',
+                                          HTTP_AUTHORIZATION='Bearer ')
+            self.assertEqual(response.status_code, 401)
+
+    @override_settings(METRICS_ENABLED=True)
+    def test_middleware_counts_requests(self):
+        labels = (('view', 'RecipeViewSet.retrieve'), ('method', 'GET'),
+                  ('status', '200'))
+        before = registry.collect()['foodgram_requests_total', labels]
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.get(f'/api/recipes/{self.recipes[0].id}/')
+        samples = registry.collect()
+        self.assertEqual(samples['foodgram_requests_total', labels],
+                         before + 1)
+        self.assertGreaterEqual(samples[
+            'foodgram_request_queries_bucket',
+            (('view', 'RecipeViewSet.retrieve'), ('le', '5'))], 1)
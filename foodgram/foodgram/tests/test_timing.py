@@ -0,0 +1,76 @@
+import json
+import re
+from unittest import mock
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from foodgram import timing
+from foodgram.timing import TimingMiddleware
+from recipes.tests.base import FoodgramTestCase
+from recipes.views import RecipeViewSet
+from rest_framework.test import APIClient
+
+SERVER_TIMING = re.compile(
+    r'total;dur=[\d.]+, db;dur=[\d.]+;desc="(?P<queries>\d+) queries", '
+    r'serialize;dur=[\d.]+, render;dur=[\d.]+')
+
+
+class TimingMiddlewareTests(SimpleTestCase):
+    def test_disabled_by_default(self):
+        with override_settings(PERFORMANCE_TIMING=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                TimingMiddleware(lambda request: HttpResponse())
+
+    @override_settings(PERFORMANCE_TIMING=True, PERFORMANCE_SAMPLE_RATE=1)
+    def test_sampled_record(self):
+        request = RequestFactory().get('/api/recipes/')
+        view = RecipeViewSet.as_view({'get': 'list'})
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return HttpResponse(status=203)
+
+        middleware = TimingMiddleware(get_response)
+        with self.assertLogs('foodgram.timing', 'INFO') as logs:
+            response = middleware(request)
+        self.assertRegex(response['Server-Timing'], SERVER_TIMING)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'RecipeViewSet.list')
+        self.assertEqual(record['method'], 'GET')
+        self.assertEqual(record['path'], '/api/recipes/')
+        self.assertEqual(record['status'], 203)
+        self.assertEqual(record['sql_count'], 0)
+        for key in ('total_ms', 'sql_ms', 'serialize_ms', 'render_ms'):
+            self.assertGreaterEqual(record[key], 0)
+
+    @override_settings(PERFORMANCE_TIMING=True, PERFORMANCE_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_logged(self):
+        middleware = TimingMiddleware(lambda request: HttpResponse())
+        with mock.patch.object(timing.logger, 'info') as info:
+            response = middleware(RequestFactory().get('/'))
+        info.assert_not_called()
+        self.assertIn('Server-Timing', response)
+
+
+@override_settings(PERFORMANCE_TIMING=True, PERFORMANCE_SAMPLE_RATE=1)
+class TimingRequestTests(FoodgramTestCase):
+    def test_server_timing_counts_queries(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertLogs('foodgram.timing', 'INFO') as logs:
+            response = client.get(f'/api/recipes/{self.recipes[0].id}/')
+        self.assertEqual(response.status_code, 200)
+        match = SERVER_TIMING.fullmatch(response['Server-Timing'])
+        self.assertIsNotNone(match, response['Server-Timing'])
+        self.assertEqual(int(match.group('queries')), 4)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'RecipeViewSet.retrieve')
+        self.assertEqual(record['sql_count'], 4)
+        self.assertGreater(record['serialize_ms'], 0)
+        self.assertGreater(record['render_ms'], 0)
+
+    def test_disabled_without_setting(self):
+        with override_settings(PERFORMANCE_TIMING=False):
+            response = APIClient().get('/api/tags/')
+        self.assertNotIn('Server-Timing', response)
@@ -0,0 +1,145 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.view = None
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.serialize_depth = 0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.sql_count += 1
+
+    def as_dict(self):
+        return {
+            'view': self.view,
+            'total_ms': round(self.total * 1000, 3),
+            'sql_count': self.sql_count,
+            'sql_ms': round(self.sql_time * 1000, 3),
+            'serialize_ms': round(self.serialize_time * 1000, 3),
+            'render_ms': round(self.render_time * 1000, 3),
+        }
+
+    def server_timing(self):
+        return ', '.join((
+            f'total;dur={self.total * 1000:.1f}',
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.sql_count} '
+            'queries"',
+            f'serialize;dur={self.serialize_time * 1000:.1f}',
+            f'render;dur={self.render_time * 1000:.1f}',
+        ))
+
+
+def get_view_name(view_func, method):
+    view_class = getattr(view_func, 'cls', None) or getattr(
+        view_func, 'view_class', None)
+    if view_class is None:
+        return f'{view_func.__module__}.{view_func.__name__}'
+    actions = getattr(view_func, 'actions', None)
+    if actions and method.lower() in actions:
+        return f'{view_class.__name__}.{actions[method.lower()]}'
+    return view_class.__name__
+
+
+def track_view(request, view_func):
+    timings = current_timings.get()
+    if timings is not None:
+        timings.view = get_view_name(view_func, request.method)
+
+
+@contextmanager
+def track_request():
+    timings = current_timings.get()
+    if timings is not None:
+        yield timings
+        return
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(timings.execute_wrapper))
+            yield timings
+    finally:
+        current_timings.reset(token)
+
+
+@contextmanager
+def timed(section):
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timings, section, getattr(timings, section)
+                + time.perf_counter() - started)
+
+
+class TimedSerializerMixin:
+    def to_representation(self, instance):
+        timings = current_timings.get()
+        if timings is None or timings.serialize_depth:
+            return super().to_representation(instance)
+        timings.serialize_depth += 1
+        try:
+            with timed('serialize_time'):
+                return super().to_representation(instance)
+        finally:
+            timings.serialize_depth -= 1
+
+
+class TimedJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('render_time'):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+
+
+class TimingMiddleware:
+    def __init__(self, get_response):
+        if not settings.PERFORMANCE_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track_request() as timings:
+            response = self.get_response(request)
+        timings.total = time.perf_counter() - timings.started
+        response['Server-Timing'] = timings.server_timing()
+        if random.random() < settings.PERFORMANCE_SAMPLE_RATE:
+            record = timings.as_dict()
+            record.update(method=request.method, path=request.path,
+                          status=response.status_code)
+            logger.info(json.dumps(record))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        track_view(request, view_func)
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from .views import MetricsView
+
 apps_patterns = [
     path('', include('users.urls')),
     path('', include('recipes.urls')),
@@ -8,5 +10,6 @@ apps_patterns = [
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics', MetricsView.as_view(), name='metrics'),
     path('api/', include(apps_patterns)),
 ]
@@ -0,0 +1,12 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+
+from .metrics import CONTENT_TYPE, registry
+from .permissions import HasMetricsAccess
+
+
+class MetricsView(APIView):
+    permission_classes = (HasMetricsAccess,)
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 from .models import (Favorite, Ingredient, Recipe, RecipeIngredient, RecipeTag,
-                     ShoppingList, Tag)
+                     ShoppingList, ShoppingListExport, Tag)
 
 
 @admin.register(Tag)
@@ -30,13 +30,11 @@ class RecipeTagsInline(admin.TabularInline):
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'name', 'author', 'in_favorite')
+    list_display = ('pk', 'name', 'author', 'favorites_count',
+                    'in_carts_count')
     list_filter = ['name', 'author', 'tags']
     inlines = (RecipeIngredientsInline, RecipeTagsInline)
 
-    def in_favorite(self, obj):
-        return obj.in_favorite.all().count()
-
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
@@ -46,3 +44,10 @@ class FavoriteAdmin(admin.ModelAdmin):
 @admin.register(ShoppingList)
 class ShoppingListAdmin(admin.ModelAdmin):
     list_display = ('pk', 'user', 'recipe')
+
+
+@admin.register(ShoppingListExport)
+class ShoppingListExportAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'file_format', 'status', 'created',
+                    'finished')
+    list_filter = ['status', 'file_format']
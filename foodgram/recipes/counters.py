@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from users.models import Follow
+
+from .models import Favorite, Recipe, ShoppingList
+
+User = get_user_model()
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'in_carts_count', ShoppingList, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Follow, 'following'),
+)
+
+
+def change_counter(model, pk, field, delta):
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def update_counters(sender, instance, delta):
+    for model, field, related_model, related_field in COUNTERS:
+        if related_model is sender:
+            change_counter(model, getattr(instance, f'{related_field}_id'),
+                           field, delta)
+
+
+def refresh_counters(sender, pks):
+    for model, field, related_model, related_field in COUNTERS:
+        if related_model is sender:
+            model.objects.filter(pk__in=pks).update(
+                **{field: count_related(related_model, related_field)})
+
+
+def count_related(related_model, related_field):
+    return Coalesce(Subquery(
+        related_model.objects.filter(
+            **{related_field: OuterRef('pk')}
+        ).order_by().values(related_field).annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def recount_counters(dry_run=False):
+    drift = {}
+    for model, field, related_model, related_field in COUNTERS:
+        actual = count_related(related_model, related_field)
+        drifted = model.objects.annotate(actual=actual).exclude(
+            **{field: F('actual')})
+        drift[f'{model._meta.label}.{field}'] = drifted.count()
+        if not dry_run and drift[f'{model._meta.label}.{field}']:
+            model.objects.filter(pk__in=drifted.values('pk')).update(
+                **{field: actual})
+    return drift
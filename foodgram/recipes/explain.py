@@ -0,0 +1,87 @@
+import json
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from users.models import Follow
+
+from .filters import RecipeFilter
+from .models import Favorite, Recipe, RecipeIngredient, Tag
+from .utils import get_ingredients_list
+from .views import RecipeViewSet
+
+User = get_user_model()
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def iter_seq_scans(plan):
+    if plan['Node Type'] == 'Seq Scan':
+        yield plan['Relation Name']
+    for child in plan.get('Plans', ()):
+        yield from iter_seq_scans(child)
+
+
+def get_table_rows(tables):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)',
+            [list(tables)])
+        return dict(cursor.fetchall())
+
+
+def find_seq_scans(queryset, min_rows):
+    tables = set(iter_seq_scans(explain(queryset)))
+    if not tables:
+        return {}
+    return {table: rows for table, rows in get_table_rows(tables).items()
+            if rows >= min_rows}
+
+
+def get_api_querysets(user):
+    request = SimpleNamespace(user=user, query_params={})
+    view = RecipeViewSet(request=request, format_kwarg=None)
+    recipes = view.get_queryset()
+    tag = Tag.objects.order_by('id').first()
+
+    def filtered(**data):
+        return RecipeFilter(data, queryset=recipes, request=request).qs
+
+    page = list(recipes.values_list('id', flat=True)[:6])
+    authors = list(User.objects.filter(
+        following__user=user).values_list('id', flat=True)[:6])
+    return {
+        'recipes-list': recipes[:6],
+        'recipes-by-tag': filtered(tags=[tag.slug] if tag else [])[:6],
+        'recipes-by-author': filtered(author=user.id)[:6],
+        'recipes-favorited': filtered(is_favorited=True)[:6],
+        'recipes-in-shopping-cart': filtered(is_in_shopping_cart=True)[:6],
+        'recipe-ingredients': RecipeIngredient.objects.filter(
+            recipe__in=page).select_related('ingredient'),
+        'recipe-tags': Tag.objects.filter(recipetag__recipe__in=page),
+        'shopping-cart': get_ingredients_list(user),
+        'favorites': Favorite.objects.filter(user=user)[:6],
+        'subscriptions': User.objects.filter(
+            following__user=user).order_by('-id')[:6],
+        'subscribed-ids': Follow.objects.filter(
+            user=user).values_list('following_id'),
+        'followers': Follow.objects.filter(
+            following=user).values_list('user_id'),
+        'authors-recipes': Recipe.objects.filter(
+            author__in=authors
+        ).annotate(row_number=Window(
+            expression=RowNumber(),
+            partition_by=[F('author_id')],
+            order_by=F('id').desc()
+        )).order_by(),
+    }
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from tempfile import TemporaryFile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.html import escape
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table
+
+from .models import RecipeIngredient, ShoppingListExport
+from .utils import SHOPPING_LIST_FORMATS, get_ingredients_list
+
+logger = logging.getLogger(__name__)
+
+PDF_FONT = 'ExportFont'
+
+executor = ThreadPoolExecutor(max_workers=settings.EXPORT_WORKERS,
+                              thread_name_prefix='shopping-exports')
+
+
+def get_cart_rows(user):
+    return RecipeIngredient.objects.filter(
+        recipe__shoppinglist__user=user
+    ).values_list(
+        'recipe_id', 'recipe__name', 'ingredient__name',
+        'ingredient__measurement_unit', 'amount'
+    ).order_by('recipe__name', 'recipe_id', 'ingredient__name')
+
+
+def get_export_digest(user, file_format):
+    if file_format == 'pdf':
+        rows = get_cart_rows(user)
+    else:
+        rows = get_ingredients_list(user).values_list(
+            'ingredient__name', 'ingredient__measurement_unit', 'amount')
+    content = hashlib.sha1(file_format.encode())
+    for row in rows.iterator():
+        content.update(json.dumps(row, ensure_ascii=False).encode())
+    return content.hexdigest()
+
+
+def get_pdf_font():
+    if PDF_FONT in pdfmetrics.getRegisteredFontNames():
+        return PDF_FONT
+    if not os.path.exists(settings.EXPORT_PDF_FONT):
+        return 'Helvetica'
+    pdfmetrics.registerFont(TTFont(PDF_FONT, settings.EXPORT_PDF_FONT))
+    return PDF_FONT
+
+
+def pdf_table(rows, font):
+    return Table(rows, colWidths=(300, 60, 100),
+                 style=[('FONTNAME', (0, 0), (-1, -1), font)])
+
+
+def write_pdf(user, file):
+    font = get_pdf_font()
+    styles = getSampleStyleSheet()
+    for style in styles.byName.values():
+        style.fontName = font
+    story = [Paragraph('Список покупок', styles['Title'])]
+    for (_, name), rows in groupby(get_cart_rows(user).iterator(),
+                                   key=lambda row: row[:2]):
+        story.append(Paragraph(escape(name), styles['Heading2']))
+        story.append(pdf_table(
+            [(ingredient, amount, unit)
+             for _, _, ingredient, unit, amount in rows], font))
+        story.append(Spacer(0, 12))
+    total = [(item['ingredient__name'], item['amount'],
+              item['ingredient__measurement_unit'])
+             for item in get_ingredients_list(user).iterator()]
+    if total:
+        story.append(Paragraph('Итого', styles['Heading2']))
+        story.append(pdf_table(total, font))
+    SimpleDocTemplate(file, pagesize=A4, title='Список покупок').build(story)
+
+
+def write_lines(user, file_format, file):
+    to_lines = SHOPPING_LIST_FORMATS[file_format][0]
+    for line in to_lines(get_ingredients_list(user)):
+        file.write(line.encode())
+
+
+def render_export(job):
+    job.digest = get_export_digest(job.user, job.file_format)
+    existing = ShoppingListExport.objects.filter(
+        digest=job.digest, status=ShoppingListExport.DONE
+    ).exclude(file='').order_by('-id').first()
+    if existing is not None:
+        job.file = existing.file.name
+    else:
+        with TemporaryFile() as file:
+            if job.file_format == 'pdf':
+                write_pdf(job.user, file)
+            else:
+                write_lines(job.user, job.file_format, file)
+            file.seek(0)
+            job.file.save(f'{uuid.uuid4()}.{job.file_format}', File(file),
+                          save=False)
+    job.status = ShoppingListExport.DONE
+    job.finished = timezone.now()
+    job.save(update_fields=['digest', 'file', 'status', 'finished'])
+
+
+def process_export(job_id):
+    try:
+        claimed = ShoppingListExport.objects.filter(
+            pk=job_id, status=ShoppingListExport.PENDING
+        ).update(status=ShoppingListExport.RUNNING)
+        if claimed:
+            render_export(ShoppingListExport.objects.select_related(
+                'user').get(pk=job_id))
+    except Exception as error:
+        logger.exception('Не удалось выгрузить список покупок %s', job_id)
+        ShoppingListExport.objects.filter(pk=job_id).update(
+            status=ShoppingListExport.FAILED, error=str(error),
+            finished=timezone.now())
+    finally:
+        connections.close_all()
+
+
+def schedule_export(job):
+    transaction.on_commit(lambda: executor.submit(process_export, job.id))
+
+
+def create_export(user, file_format):
+    existing = user.shopping_list_exports.filter(
+        file_format=file_format, status=ShoppingListExport.PENDING
+    ).first()
+    if existing is not None:
+        return existing
+    job = ShoppingListExport.objects.create(user=user,
+                                            file_format=file_format)
+    schedule_export(job)
+    return job
@@ -0,0 +1,88 @@
+import binascii
+import re
+import uuid
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from PIL import Image, UnidentifiedImageError
+from rest_framework.serializers import ImageField, ValidationError
+
+BASE64_HEADER = re.compile(r'data:(?P<content_type>[\w/+.-]+);base64,')
+WHITESPACE = re.compile(r'\s+')
+CHUNK_SIZE = 256 * 1024
+HEADER_SIZE = 64 * 1024
+ALLOWED_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+
+
+def check_dimensions(header):
+    try:
+        image = Image.open(BytesIO(header))
+    except Image.DecompressionBombError:
+        raise ValidationError('Картинка слишком большая')
+    except (UnidentifiedImageError, OSError):
+        return None
+    if image.format not in ALLOWED_FORMATS:
+        raise ValidationError('Неподдерживаемый формат картинки')
+    width, height = image.size
+    if width * height > settings.RECIPE_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            f'Картинка слишком большая: {width}x{height} пикселей')
+    return image.format
+
+
+def iter_base64_chunks(data, start):
+    rest = ''
+    for offset in range(start, len(data), CHUNK_SIZE):
+        chunk = rest + WHITESPACE.sub('', data[offset:offset + CHUNK_SIZE])
+        cut = len(chunk) - len(chunk) % 4
+        chunk, rest = chunk[:cut], chunk[cut:]
+        try:
+            yield binascii.a2b_base64(chunk)
+        except binascii.Error:
+            raise ValidationError('Некорректная картинка в base64')
+    if rest:
+        raise ValidationError('Некорректная картинка в base64')
+
+
+def write_base64_image(data, start, file):
+    image_format = None
+    header = b''
+    for decoded in iter_base64_chunks(data, start):
+        file.write(decoded)
+        if image_format is None and len(header) < HEADER_SIZE:
+            header += decoded
+            image_format = check_dimensions(header)
+    if image_format is None:
+        file.seek(0)
+        image_format = check_dimensions(file.read(HEADER_SIZE))
+    if image_format is None:
+        raise ValidationError('Загрузите корректную картинку')
+    return image_format
+
+
+def decode_base64_image(data):
+    match = BASE64_HEADER.match(data, 0, 200)
+    start = match.end() if match else 0
+    if (len(data) - start) * 3 // 4 > settings.RECIPE_IMAGE_MAX_SIZE:
+        raise ValidationError('Размер картинки превышает допустимый')
+    content_type = match.group('content_type') if match else None
+    file = TemporaryUploadedFile('image', content_type, 0, None)
+    try:
+        image_format = write_base64_image(data, start, file)
+    except ValidationError:
+        file.close()
+        raise
+    file.size = file.tell()
+    file.seek(0)
+    file.name = f'{uuid.uuid4()}.{ALLOWED_FORMATS[image_format]}'
+    return file
+
+
+class Base64ImageStreamField(ImageField):
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = decode_base64_image(data)
+        elif getattr(data, 'size', 0) > settings.RECIPE_IMAGE_MAX_SIZE:
+            raise ValidationError('Размер картинки превышает допустимый')
+        return super().to_internal_value(data)
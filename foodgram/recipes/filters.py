@@ -1,6 +1,9 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
 
-from .models import Ingredient, Recipe
+from .models import (Favorite, Ingredient, Recipe, RecipeTag, ShoppingList,
+                     Tag)
+from .search import search_recipes
 
 
 class IngredientsFilter(filters.FilterSet):
@@ -12,23 +15,42 @@ class IngredientsFilter(filters.FilterSet):
 
 
 class RecipeFilter(filters.FilterSet):
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug',
-                                           label='Tags')
+    tags = filters.ModelMultipleChoiceFilter(queryset=Tag.objects.all(),
+                                             to_field_name='slug',
+                                             method='get_tags', label='Tags')
     is_favorited = filters.BooleanFilter(method='get_favorite',
                                          label='Favorited')
     is_in_shopping_cart = filters.BooleanFilter(method='get_shopping',
                                                 label='Is in shopping list')
+    search = filters.CharFilter(method='get_search', label='Search')
 
     class Meta:
         model = Recipe
-        fields = ('is_favorited', 'author', 'tags', 'is_in_shopping_cart')
+        fields = ('is_favorited', 'author', 'tags', 'is_in_shopping_cart',
+                  'search')
+
+    def get_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(Exists(RecipeTag.objects.filter(
+            recipe=OuterRef('pk'),
+            tag_id__in=[tag.id for tag in value]
+        )))
+
+    def filter_user_relation(self, queryset, model, value):
+        if not value:
+            return queryset
+        user = self.request.user
+        if user.is_anonymous:
+            return queryset.none()
+        return queryset.filter(Exists(model.objects.filter(
+            user=user, recipe=OuterRef('pk'))))
 
     def get_favorite(self, queryset, name, value):
-        if value:
-            return Recipe.objects.filter(in_favorite__user=self.request.user)
-        return Recipe.objects.all()
+        return self.filter_user_relation(queryset, Favorite, value)
 
     def get_shopping(self, queryset, name, value):
-        if value:
-            return Recipe.objects.filter(shoppinglist__user=self.request.user)
-        return Recipe.objects.all()
+        return self.filter_user_relation(queryset, ShoppingList, value)
+
+    def get_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
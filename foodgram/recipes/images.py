@@ -0,0 +1,66 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = (
+    ('thumbnail', True, 'JPEG', 'jpg'),
+    ('thumbnail_webp', True, 'WEBP', 'webp'),
+    ('image_webp', False, 'WEBP', 'webp'),
+)
+
+executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS,
+                              thread_name_prefix='recipe-images')
+
+
+def render_variant(image, thumbnail, file_format):
+    if thumbnail:
+        image = ImageOps.fit(image, settings.RECIPE_THUMBNAIL_SIZE)
+    if file_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(buffer, file_format, quality=settings.IMAGE_QUALITY)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_image_variants(recipe):
+    with recipe.image.open('rb') as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+    name = os.path.splitext(os.path.basename(recipe.image.name))[0]
+    for field, thumbnail, file_format, extension in VARIANTS:
+        variant = getattr(recipe, field)
+        if variant:
+            variant.delete(save=False)
+        variant.save(f'{name}.{extension}',
+                     render_variant(image, thumbnail, file_format),
+                     save=False)
+    recipe.save(update_fields=[field for field, *_ in VARIANTS])
+
+
+def process_recipe_image(recipe_id):
+    try:
+        recipe = Recipe.objects.filter(pk=recipe_id).first()
+        if recipe is not None and recipe.image:
+            generate_image_variants(recipe)
+    except Exception:
+        logger.exception('Не удалось обработать картинку рецепта %s',
+                         recipe_id)
+    finally:
+        connections.close_all()
+
+
+def schedule_image_variants(recipe):
+    transaction.on_commit(
+        lambda: executor.submit(process_recipe_image, recipe.id))
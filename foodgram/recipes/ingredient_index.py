@@ -0,0 +1,57 @@
+import threading
+import time
+from bisect import bisect_left
+
+from .models import Ingredient
+
+
+class IngredientIndex:
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._keys = None
+        self._entries = None
+        self._loaded_at = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._keys = None
+            self._entries = None
+
+    def _load(self):
+        with self._lock:
+            expired = time.monotonic() - self._loaded_at > self.ttl
+            if self._entries is None or expired:
+                entries = sorted(
+                    (name.lower(), pk, name, measurement_unit)
+                    for pk, name, measurement_unit in
+                    Ingredient.objects.values_list(
+                        'id', 'name', 'measurement_unit')
+                )
+                self._keys = [entry[0] for entry in entries]
+                self._entries = entries
+                self._loaded_at = time.monotonic()
+            return self._keys, self._entries
+
+    def search(self, query, limit):
+        keys, entries = self._load()
+        query = query.lower()
+        found = []
+        index = bisect_left(keys, query)
+        while (index < len(keys) and len(found) < limit
+               and keys[index].startswith(query)):
+            found.append(entries[index])
+            index += 1
+        if len(found) < limit:
+            for entry in entries:
+                if query in entry[0] and not entry[0].startswith(query):
+                    found.append(entry)
+                    if len(found) == limit:
+                        break
+        return [
+            {'id': pk, 'name': name, 'measurement_unit': measurement_unit}
+            for _, pk, name, measurement_unit in found
+        ]
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,295 @@
+import json
+import os
+import tempfile
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from recipes.exports import render_export
+from recipes.models import (Favorite, Ingredient, Recipe, ShoppingList,
+                            ShoppingListExport, Tag)
+from rest_framework.authtoken.models import Token
+from users.models import Follow
+
+from .seed_data import SEED_PASSWORD
+
+User = get_user_model()
+
+IMAGE = ('data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAA'
+         'fFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==')
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(timings, rank):
+    ordered = sorted(timings)
+    index = round(rank / 100 * (len(ordered) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержку и число SQL-запросов для каждого эндпоинта '
+            'API и сравнивает их с сохранённым базовым уровнем')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--label', default='default',
+                            help='Имя набора данных, например 10k')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--only', default='',
+                            help='Замерять только эндпоинты с этой подстрокой')
+        parser.add_argument('--baseline', default=os.path.join(
+            settings.BASE_DIR, 'benchmark_baseline.json'))
+        parser.add_argument('--update-baseline', action='store_true')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Допустимый рост p50, доля от базового')
+        parser.add_argument('--min-slowdown-ms', type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            results = self.run(options)
+            transaction.set_rollback(True)
+        baseline = self.read_baseline(options['baseline'])
+        if options['update_baseline']:
+            baseline.setdefault(options['label'], {}).update(results)
+            with open(options['baseline'], 'w', encoding='utf-8') as file:
+                json.dump(baseline, file, ensure_ascii=False, indent=2,
+                          sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(
+                f'Базовый уровень сохранён в {options["baseline"]}'))
+            return
+        regressions = self.compare(results,
+                                   baseline.get(options['label'], {}),
+                                   options)
+        if regressions:
+            raise CommandError('Обнаружены регрессии:\n'
+                               + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Регрессий не обнаружено'))
+
+    def run(self, options):
+        results = {}
+        with tempfile.TemporaryDirectory() as media_root:
+            with override_settings(MEDIA_ROOT=media_root):
+                self.prepare_objects()
+                for name, method, path, data, setup in self.get_endpoints():
+                    if options['only'] not in name:
+                        continue
+                    results[name] = self.measure(
+                        method, path, data, setup,
+                        options['repeat'], options['warmup'])
+                    self.stdout.write(self.format_result(name,
+                                                         results[name]))
+        return results
+
+    def prepare_objects(self):
+        self.user = User.objects.filter(
+            recipes__isnull=False, follower__isnull=False
+        ).order_by('id').first()
+        if self.user is None:
+            raise CommandError('База пуста, сначала выполните seed_data')
+        self.user.set_password(SEED_PASSWORD)
+        self.user.save(update_fields=['password'])
+        self.token, _ = Token.objects.get_or_create(user=self.user)
+        self.own_recipe = self.user.recipes.order_by('id').first()
+        self.recipe = Recipe.objects.exclude(
+            author=self.user).order_by('id').first() or self.own_recipe
+        self.author = (
+            User.objects.exclude(id=self.user.id).exclude(
+                following__user=self.user).order_by('id').first()
+            or self.recipe.author)
+        self.ingredient_ids = list(Ingredient.objects.order_by(
+            'id').values_list('id', flat=True)[:10])
+        self.tags = list(Tag.objects.order_by('id')[:2])
+        self.recipe_ids = list(Recipe.objects.exclude(
+            author=self.user).order_by('id').values_list('id', flat=True)[:10])
+        self.author_ids = list(User.objects.exclude(
+            id=self.user.id).order_by('id').values_list('id', flat=True)[:10])
+        self.export = ShoppingListExport.objects.create(user=self.user,
+                                                        file_format='txt')
+        render_export(self.export)
+        self.client = Client(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.anonymous_client = Client()
+
+    def get_endpoints(self):
+        recipe = self.recipe.id
+        own_recipe = self.own_recipe.id
+        author = self.author.id
+        tags = urlencode([('tags', tag.slug) for tag in self.tags])
+        export = self.export.id
+        user_data = {
+            'email': 'benchmark@example.com',
+            'username': 'benchmark',
+            'first_name': 'Замер',
+            'last_name': 'Замеров',
+            'password': 'Benchmark-password-1',
+        }
+        recipe_data = {
+            'ingredients': [{'id': ingredient_id, 'amount': 10}
+                            for ingredient_id in self.ingredient_ids],
+            'tags': [tag.id for tag in self.tags],
+            'image': IMAGE,
+            'name': 'Рецепт для замера',
+            'text': 'Описание',
+            'cooking_time': 10,
+        }
+
+        def add_favorite():
+            Favorite.objects.get_or_create(user=self.user, recipe_id=recipe)
+
+        def add_to_cart():
+            ShoppingList.objects.get_or_create(user=self.user,
+                                               recipe_id=recipe)
+
+        def follow():
+            Follow.objects.get_or_create(user=self.user, following_id=author)
+
+        def unfollow():
+            Follow.objects.filter(user=self.user,
+                                  following_id=author).delete()
+
+        def remove_favorite():
+            Favorite.objects.filter(user=self.user,
+                                    recipe_id=recipe).delete()
+
+        def remove_from_cart():
+            ShoppingList.objects.filter(user=self.user,
+                                        recipe_id=recipe).delete()
+
+        return (
+            ('ingredients-list', 'get', '/api/ingredients/', None, None),
+            ('ingredients-search', 'get', '/api/ingredients/?name=са',
+             None, None),
+            ('ingredients-detail', 'get',
+             f'/api/ingredients/{self.ingredient_ids[0]}/', None, None),
+            ('tags-list', 'get', '/api/tags/', None, None),
+            ('tags-detail', 'get', f'/api/tags/{self.tags[0].id}/',
+             None, None),
+            ('recipes-list-anonymous', 'anonymous', '/api/recipes/',
+             None, None),
+            ('recipes-list', 'get', '/api/recipes/?limit=50', None, None),
+            ('recipes-list-tags', 'get', f'/api/recipes/?{tags}', None, None),
+            ('recipes-list-favorited', 'get',
+             '/api/recipes/?is_favorited=1', None, None),
+            ('recipes-list-shopping-cart', 'get',
+             '/api/recipes/?is_in_shopping_cart=1', None, None),
+            ('recipes-list-author', 'get',
+             f'/api/recipes/?author={author}', None, None),
+            ('recipes-detail', 'get', f'/api/recipes/{recipe}/', None, None),
+            ('recipes-create', 'post', '/api/recipes/', recipe_data, None),
+            ('recipes-update', 'patch', f'/api/recipes/{own_recipe}/',
+             recipe_data, None),
+            ('recipes-delete', 'delete', f'/api/recipes/{own_recipe}/',
+             None, None),
+            ('recipes-favorite', 'get', f'/api/recipes/{recipe}/favorite/',
+             None, remove_favorite),
+            ('recipes-favorite-delete', 'delete',
+             f'/api/recipes/{recipe}/favorite/', None, add_favorite),
+            ('recipes-shopping-cart', 'get',
+             f'/api/recipes/{recipe}/shopping_cart/', None,
+             remove_from_cart),
+            ('recipes-shopping-cart-delete', 'delete',
+             f'/api/recipes/{recipe}/shopping_cart/', None, add_to_cart),
+            ('recipes-download-shopping-cart', 'get',
+             '/api/recipes/download_shopping_cart/', None, None),
+            ('recipes-bulk-favorite', 'post', '/api/recipes/favorite/',
+             {'ids': self.recipe_ids}, None),
+            ('recipes-bulk-shopping-cart', 'post',
+             '/api/recipes/shopping_cart/', {'ids': self.recipe_ids}, None),
+            ('shopping-list-exports-create', 'post',
+             '/api/shopping_list_exports/', {'format': 'txt'}, None),
+            ('shopping-list-exports-detail', 'get',
+             f'/api/shopping_list_exports/{export}/', None, None),
+            ('shopping-list-exports-download', 'get',
+             f'/api/shopping_list_exports/{export}/download/', None, None),
+            ('users-list', 'get', '/api/users/', None, None),
+            ('users-create', 'anonymous-post', '/api/users/', user_data,
+             None),
+            ('users-detail', 'get', f'/api/users/{author}/', None, None),
+            ('users-me', 'get', '/api/users/me/', None, None),
+            ('users-set-password', 'post', '/api/users/set_password/',
+             {'current_password': SEED_PASSWORD,
+              'new_password': 'Another-seed-password-1'}, None),
+            ('users-subscriptions', 'get',
+             '/api/users/subscriptions/?recipes_limit=3', None, None),
+            ('users-subscribe', 'get', f'/api/users/{author}/subscribe/',
+             None, unfollow),
+            ('users-subscribe-delete', 'delete',
+             f'/api/users/{author}/subscribe/', None, follow),
+            ('users-bulk-subscribe', 'post', '/api/users/subscribe/',
+             {'ids': self.author_ids}, None),
+            ('auth-token-login', 'anonymous-post', '/api/auth/token/login/',
+             {'email': self.user.email, 'password': SEED_PASSWORD}, None),
+            ('auth-token-logout', 'post', '/api/auth/token/logout/',
+             None, None),
+        )
+
+    def request(self, method, path, data):
+        client = self.client
+        if method.startswith('anonymous'):
+            client = self.anonymous_client
+            method = method.partition('-')[2] or 'get'
+        if data is None:
+            response = getattr(client, method)(path)
+        else:
+            response = getattr(client, method)(
+                path, json.dumps(data), content_type='application/json')
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def measure(self, method, path, data, setup, repeat, warmup):
+        timings = []
+        queries = 0
+        status = None
+        for number in range(warmup + repeat):
+            with transaction.atomic():
+                if setup is not None:
+                    setup()
+                with CaptureQueriesContext(connection) as context:
+                    start = time.perf_counter()
+                    response = self.request(method, path, data)
+                    elapsed = time.perf_counter() - start
+                transaction.set_rollback(True)
+            if number < warmup:
+                continue
+            timings.append(elapsed * 1000)
+            queries = max(queries, len(context))
+            status = response.status_code
+        result = {f'p{rank}': round(percentile(timings, rank), 3)
+                  for rank in PERCENTILES}
+        result.update(queries=queries, status=status)
+        return result
+
+    def format_result(self, name, result):
+        latency = ' '.join(f'p{rank}={result[f"p{rank}"]:.1f}ms'
+                           for rank in PERCENTILES)
+        return (f'{name:<34} {result["status"]} {latency} '
+                f'queries={result["queries"]}')
+
+    def read_baseline(self, path):
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def compare(self, results, baseline, options):
+        regressions = []
+        for name, result in results.items():
+            expected = baseline.get(name)
+            if expected is None:
+                continue
+            if result['queries'] > expected['queries']:
+                regressions.append(
+                    f'{name}: запросов {result["queries"]}, '
+                    f'базовый уровень {expected["queries"]}')
+            limit = max(expected['p50'] * (1 + options['tolerance']),
+                        expected['p50'] + options['min_slowdown_ms'])
+            if result['p50'] > limit:
+                regressions.append(
+                    f'{name}: p50 {result["p50"]:.1f}ms, '
+                    f'базовый уровень {expected["p50"]:.1f}ms')
+        return regressions
@@ -0,0 +1,53 @@
+import base64
+import os
+import tracemalloc
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from PIL import Image
+from recipes.fields import decode_base64_image
+
+MEGABYTE = 1024 * 1024
+
+
+def decode_in_memory(data):
+    encoded = data.split(';base64,')[1]
+    decoded = base64.b64decode(encoded)
+    Image.open(BytesIO(decoded)).verify()
+    return decoded
+
+
+def decode_streamed(data):
+    file = decode_base64_image(data)
+    Image.open(file.temporary_file_path()).verify()
+    file.close()
+
+
+class Command(BaseCommand):
+    help = ('Замеряет пиковое потребление памяти при разборе картинки '
+            'рецепта в base64')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size-mb', type=float, default=10)
+
+    def make_payload(self, size):
+        side = int((size / 3) ** 0.5)
+        image = Image.frombytes('RGB', (side, side),
+                                os.urandom(side * side * 3))
+        buffer = BytesIO()
+        image.save(buffer, 'PNG', compress_level=0)
+        return 'data:image/png;base64,' + base64.b64encode(
+            buffer.getvalue()).decode()
+
+    def measure(self, name, decode, data):
+        tracemalloc.start()
+        decode(data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(f'{name:<10} пик памяти {peak / MEGABYTE:.1f} MiB')
+
+    def handle(self, *args, **options):
+        data = self.make_payload(options['size_mb'] * MEGABYTE)
+        self.stdout.write(f'base64 строка: {len(data) / MEGABYTE:.1f} MiB')
+        self.measure('streamed', decode_streamed, data)
+        self.measure('in-memory', decode_in_memory, data)
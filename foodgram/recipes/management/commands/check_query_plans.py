@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from recipes.explain import find_seq_scans, get_api_querysets
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Выполняет EXPLAIN для запросов API на PostgreSQL и завершается '
+            'с ошибкой, если в плане есть последовательное сканирование '
+            'большой таблицы')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-rows', type=int, default=10000,
+                            help='Порог размера таблицы в строках')
+
+    def get_user(self):
+        user = User.objects.annotate(
+            follows=Count('follower')
+        ).order_by('-follows', 'id').first()
+        if user is None:
+            raise CommandError('База пуста, сначала выполните seed_data')
+        return user
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('EXPLAIN проверяется только на PostgreSQL')
+        failures = []
+        for name, queryset in get_api_querysets(self.get_user()).items():
+            seq_scans = find_seq_scans(queryset, options['min_rows'])
+            if seq_scans:
+                tables = ', '.join(f'{table} ({rows:.0f} строк)'
+                                   for table, rows in seq_scans.items())
+                failures.append(f'{name}: Seq Scan по {tables}')
+            else:
+                self.stdout.write(f'{name}: OK')
+        if failures:
+            raise CommandError('\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('Последовательных сканирований '
+                                             'больших таблиц нет'))
@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from recipes.ingredient_index import ingredient_index
+from recipes.models import Ingredient
+from recipes.payloads import ingredients_payload
+
+READ_SIZE = 64 * 1024
+
+
+def iter_json(file):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+    while True:
+        buffer = buffer.lstrip(' \t\r\n,[]')
+        if not buffer:
+            if eof:
+                return
+            chunk = file.read(READ_SIZE)
+            eof = not chunk
+            buffer = chunk
+            continue
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = file.read(READ_SIZE)
+            if not chunk:
+                raise CommandError('Некорректный JSON во входном файле')
+            buffer += chunk
+            continue
+        buffer = buffer[end:]
+        if isinstance(item, dict) and 'fields' in item:
+            item = item['fields']
+        yield item
+
+
+def iter_csv(file):
+    yield from csv.DictReader(file)
+
+
+class Command(BaseCommand):
+    help = ('Загружает ингредиенты из JSON/CSV пачками, пропуская '
+            'уже существующие пары (название, единица измерения)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=('json', 'csv'),
+                            help='По умолчанию определяется по расширению')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--method', choices=('bulk', 'copy'),
+                            help='copy доступен только для PostgreSQL')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or os.path.splitext(
+            options['path'])[1].lstrip('.').lower()
+        if file_format not in ('json', 'csv'):
+            raise CommandError('Поддерживаются только JSON и CSV')
+        method = options['method'] or (
+            'copy' if connection.vendor == 'postgresql' else 'bulk')
+        if method == 'copy' and connection.vendor != 'postgresql':
+            raise CommandError('COPY поддерживается только PostgreSQL')
+        self.stats = dict.fromkeys(
+            ('read', 'duplicates', 'existing', 'created'), 0)
+        started = time.monotonic()
+        try:
+            with open(options['path'], encoding='utf-8', newline='') as file:
+                rows = iter_json(file) if file_format == 'json' else iter_csv(
+                    file)
+                self.import_rows(rows, options['batch_size'], method,
+                                 options['dry_run'], started)
+        except OSError as error:
+            raise CommandError(f'Не удалось прочитать файл: {error}')
+        if not options['dry_run']:
+            ingredient_index.invalidate()
+            ingredients_payload.invalidate()
+        self.report(started, final=True)
+
+    def import_rows(self, rows, batch_size, method, dry_run, started):
+        seen = set()
+        batch = []
+        for row in rows:
+            self.stats['read'] += 1
+            if not isinstance(row, dict):
+                raise CommandError(
+                    f'Строка {self.stats["read"]}: ожидается объект, '
+                    f'получено {type(row).__name__}')
+            try:
+                key = (row['name'].strip(), row['measurement_unit'].strip())
+            except (KeyError, AttributeError):
+                raise CommandError(
+                    f'Строка {self.stats["read"]}: нужны поля name и '
+                    'measurement_unit')
+            if key in seen:
+                self.stats['duplicates'] += 1
+                continue
+            seen.add(key)
+            batch.append(key)
+            if len(batch) == batch_size:
+                self.write_batch(batch, method, dry_run)
+                self.report(started)
+                batch = []
+        if batch:
+            self.write_batch(batch, method, dry_run)
+
+    def write_batch(self, batch, method, dry_run):
+        names = list({name for name, _ in batch})
+        step = connection.ops.bulk_batch_size(['name'], names)
+        existing = set()
+        for start in range(0, len(names), step):
+            existing.update(Ingredient.objects.filter(
+                name__in=names[start:start + step]
+            ).values_list('name', 'measurement_unit'))
+        new = [key for key in batch if key not in existing]
+        self.stats['existing'] += len(batch) - len(new)
+        self.stats['created'] += len(new)
+        if dry_run or not new:
+            return
+        with transaction.atomic():
+            if method == 'copy':
+                self.copy_batch(new)
+            else:
+                Ingredient.objects.bulk_create(
+                    (Ingredient(name=name, measurement_unit=unit)
+                     for name, unit in new),
+                    ignore_conflicts=True)
+
+    def copy_batch(self, batch):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(batch)
+        buffer.seek(0)
+        table = Ingredient._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMP TABLE ingredient_import '
+                '(name varchar(200), measurement_unit varchar(200)) '
+                'ON COMMIT DROP')
+            cursor.copy_expert(
+                'COPY ingredient_import (name, measurement_unit) '
+                'FROM STDIN WITH CSV', buffer)
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                'SELECT name, measurement_unit FROM ingredient_import '
+                'ON CONFLICT DO NOTHING')
+
+    def report(self, started, final=False):
+        elapsed = time.monotonic() - started
+        rate = self.stats['read'] / elapsed if elapsed else 0
+        message = (
+            f'прочитано {self.stats["read"]}, '
+            f'повторов во входных данных {self.stats["duplicates"]}, '
+            f'уже в базе {self.stats["existing"]}, '
+            f'новых {self.stats["created"]}, '
+            f'{rate:.0f} строк/с за {elapsed:.1f} с')
+        if final:
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(message)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from recipes.exports import process_export
+from recipes.models import ShoppingListExport
+
+
+class Command(BaseCommand):
+    help = ('Выполняет выгрузки списков покупок, оставшиеся в очереди '
+            'после перезапуска сервера')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--running', action='store_true',
+                            help='Перезапустить и прерванные выгрузки')
+
+    def handle(self, *args, **options):
+        statuses = [ShoppingListExport.PENDING]
+        if options['running']:
+            statuses.append(ShoppingListExport.RUNNING)
+        jobs = ShoppingListExport.objects.filter(status__in=statuses)
+        job_ids = list(jobs.values_list('id', flat=True))
+        jobs.update(status=ShoppingListExport.PENDING)
+        for job_id in job_ids:
+            process_export(job_id)
+        done = ShoppingListExport.objects.filter(
+            id__in=job_ids, status=ShoppingListExport.DONE).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено выгрузок: {done} из {len(job_ids)}'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from recipes.images import generate_image_variants
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = ('Создаёт миниатюры и WebP-версии картинок рецептов, '
+            'для которых они ещё не готовы')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Пересоздать варианты для всех рецептов')
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='')
+        if not options['all']:
+            recipes = recipes.filter(thumbnail='')
+        processed = 0
+        for recipe in recipes.iterator():
+            try:
+                generate_image_variants(recipe)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'Рецепт {recipe.id}: {error}')
+                continue
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано картинок: {processed}'))
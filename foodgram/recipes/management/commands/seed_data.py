@@ -0,0 +1,166 @@
+import json
+import os
+import random
+import uuid
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from PIL import Image
+from recipes.counters import recount_counters
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            RecipeTag, ShoppingList, Tag)
+from users.models import Follow
+
+User = get_user_model()
+
+SCALES = {
+    '1k': 100,
+    '10k': 1000,
+    '100k': 10000,
+}
+RECIPES_PER_USER = 10
+SEED_PASSWORD = 'seed-password'
+SEED_IMAGE = 'recipes/seed.png'
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, рецептами, '
+            'подписками, избранным и списками покупок')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES,
+                            help='Готовый объём: число рецептов')
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--recipes-per-user', type=int,
+                            default=RECIPES_PER_USER)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--follows-per-user', type=int, default=5)
+        parser.add_argument('--favorites-per-user', type=int, default=10)
+        parser.add_argument('--cart-per-user', type=int, default=5)
+        parser.add_argument('--fixture', default=os.path.join(
+            settings.BASE_DIR, 'fixtures', 'ingredients.json'))
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['scale']:
+            options['users'] = SCALES[options['scale']]
+            options['recipes_per_user'] = RECIPES_PER_USER
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.run_id = uuid.uuid4().hex[:8]
+        self.create_seed_image()
+        with transaction.atomic():
+            ingredient_ids = self.load_ingredients(options['fixture'])
+            tag_ids = self.create_tags()
+            user_ids = self.create_users(options['users'])
+            recipe_ids = self.create_recipes(
+                user_ids, options['recipes_per_user'])
+            self.create_recipe_relations(
+                recipe_ids, ingredient_ids, tag_ids,
+                options['ingredients_per_recipe'])
+            self.create_user_relations(user_ids, recipe_ids, options)
+            recount_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано пользователей: {len(user_ids)}, '
+            f'рецептов: {len(recipe_ids)}'))
+
+    def sample(self, population, count):
+        return self.random.sample(population, min(count, len(population)))
+
+    def create_seed_image(self):
+        if default_storage.exists(SEED_IMAGE):
+            return
+        buffer = BytesIO()
+        Image.new('RGB', (480, 320), (230, 108, 45)).save(buffer, 'PNG')
+        default_storage.save(SEED_IMAGE, ContentFile(buffer.getvalue()))
+
+    def load_ingredients(self, fixture):
+        if not Ingredient.objects.exists():
+            try:
+                with open(fixture, encoding='utf-8') as file:
+                    rows = json.load(file)
+            except OSError as error:
+                raise CommandError(f'Не удалось прочитать {fixture}: {error}')
+            Ingredient.objects.bulk_create(
+                (Ingredient(**row['fields']) for row in rows),
+                batch_size=self.batch_size)
+        return list(Ingredient.objects.values_list('id', flat=True))
+
+    def create_tags(self):
+        if not Tag.objects.exists():
+            Tag.objects.bulk_create(
+                Tag(name=name, color=color, slug=f'tag-{number}')
+                for number, (color, name) in enumerate(Tag.COLOR_CHOICES)
+            )
+        return list(Tag.objects.values_list('id', flat=True))
+
+    def create_users(self, count):
+        password = make_password(SEED_PASSWORD)
+        users = [
+            User(email=f'seed-{self.run_id}-{number}@example.com',
+                 username=f'seed-{self.run_id}-{number}',
+                 first_name=f'Имя{number}',
+                 last_name=f'Фамилия{number}',
+                 password=password)
+            for number in range(count)
+        ]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        return list(User.objects.filter(
+            username__in=[user.username for user in users]
+        ).values_list('id', flat=True))
+
+    def create_recipes(self, user_ids, per_user):
+        last_id = Recipe.objects.order_by('-id').values_list(
+            'id', flat=True).first() or 0
+        Recipe.objects.bulk_create(
+            (Recipe(name=f'Рецепт {number} автора {user_id}',
+                    author_id=user_id,
+                    text='Синтетический рецепт для нагрузочных тестов',
+                    cooking_time=self.random.randint(1, 180),
+                    image=SEED_IMAGE)
+             for user_id in user_ids for number in range(per_user)),
+            batch_size=self.batch_size)
+        return list(Recipe.objects.filter(id__gt=last_id).values_list(
+            'id', flat=True))
+
+    def create_recipe_relations(self, recipe_ids, ingredient_ids, tag_ids,
+                                per_recipe):
+        RecipeIngredient.objects.bulk_create(
+            (RecipeIngredient(recipe_id=recipe_id, ingredient_id=ingredient_id,
+                              amount=self.random.randint(1, 500))
+             for recipe_id in recipe_ids
+             for ingredient_id in self.sample(ingredient_ids, per_recipe)),
+            batch_size=self.batch_size)
+        RecipeTag.objects.bulk_create(
+            (RecipeTag(recipe_id=recipe_id, tag_id=tag_id)
+             for recipe_id in recipe_ids
+             for tag_id in self.sample(tag_ids, self.random.randint(1, 3))),
+            batch_size=self.batch_size)
+
+    def create_user_relations(self, user_ids, recipe_ids, options):
+        Follow.objects.bulk_create(
+            (Follow(user_id=user_id, following_id=following_id)
+             for user_id in user_ids
+             for following_id in self.sample(
+                 user_ids, options['follows_per_user'])
+             if following_id != user_id),
+            batch_size=self.batch_size, ignore_conflicts=True)
+        Favorite.objects.bulk_create(
+            (Favorite(user_id=user_id, recipe_id=recipe_id)
+             for user_id in user_ids
+             for recipe_id in self.sample(
+                 recipe_ids, options['favorites_per_user'])),
+            batch_size=self.batch_size, ignore_conflicts=True)
+        ShoppingList.objects.bulk_create(
+            (ShoppingList(user_id=user_id, recipe_id=recipe_id)
+             for user_id in user_ids
+             for recipe_id in self.sample(
+                 recipe_ids, options['cart_per_user'])),
+            batch_size=self.batch_size, ignore_conflicts=True)
@@ -1,8 +1,29 @@
 from rest_framework import mixins, viewsets
 
+from .response_cache import recipes_cache
+
 
 class RetriveAndListViewSet(
         mixins.ListModelMixin,
         mixins.RetrieveModelMixin,
         viewsets.GenericViewSet):
     pass
+
+
+class CreateAndRetrieveViewSet(
+        mixins.CreateModelMixin,
+        mixins.RetrieveModelMixin,
+        viewsets.GenericViewSet):
+    pass
+
+
+class AnonymousCacheMixin:
+    def list(self, request, *args, **kwargs):
+        return recipes_cache.get_response(
+            request, lambda: super(AnonymousCacheMixin, self).list(
+                request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return recipes_cache.get_response(
+            request, lambda: super(AnonymousCacheMixin, self).retrieve(
+                request, *args, **kwargs))
@@ -1,9 +1,11 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
-from django.db.models import (CASCADE, PROTECT, CharField, ForeignKey,
-                              ImageField, ManyToManyField, Model,
-                              PositiveIntegerField, TextField,
-                              UniqueConstraint)
+from django.db.models import (CASCADE, PROTECT, CharField, DateTimeField,
+                              FileField, ForeignKey, ImageField, Index,
+                              ManyToManyField, Model, PositiveIntegerField,
+                              TextField, UniqueConstraint)
+from users.models import CounterFieldsMixin
 
 User = get_user_model()
 
@@ -19,6 +21,12 @@ class Ingredient(Model):
     )
 
     class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['name', 'measurement_unit'],
+                name='unique_ingredient'
+            )
+        ]
         ordering = ('name',)
         verbose_name = 'Ингридиент'
         verbose_name_plural = 'Ингридиенты'
@@ -67,7 +75,7 @@ class Tag(Model):
         return self.name
 
 
-class Recipe(Model):
+class Recipe(CounterFieldsMixin, Model):
     name = CharField(
         verbose_name='Название',
         max_length=200
@@ -102,8 +110,45 @@ class Recipe(Model):
         verbose_name='Картинка',
         upload_to='recipes/'
     )
+    thumbnail = ImageField(
+        verbose_name='Миниатюра',
+        upload_to='recipes/thumbnails/',
+        blank=True,
+        editable=False
+    )
+    thumbnail_webp = ImageField(
+        verbose_name='Миниатюра WebP',
+        upload_to='recipes/thumbnails/',
+        blank=True,
+        editable=False
+    )
+    image_webp = ImageField(
+        verbose_name='Картинка WebP',
+        upload_to='recipes/webp/',
+        blank=True,
+        editable=False
+    )
+    favorites_count = PositiveIntegerField(
+        verbose_name='В избранном',
+        default=0,
+        editable=False
+    )
+    in_carts_count = PositiveIntegerField(
+        verbose_name='В списках покупок',
+        default=0,
+        editable=False
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False
+    )
+
+    counter_fields = ('favorites_count', 'in_carts_count')
 
     class Meta:
+        indexes = [
+            Index(fields=['author', '-id'], name='recipe_author_id_idx'),
+        ]
         ordering = ('-id',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
@@ -128,6 +173,12 @@ class RecipeIngredient(Model):
     )
 
     class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['ingredient', 'recipe'],
+                name='unique_ingredient_in_recipe'
+            )
+        ]
         verbose_name = 'Ингридиент'
         verbose_name_plural = 'Ингридиенты'
 
@@ -147,6 +198,9 @@ class RecipeTag(Model):
     )
 
     class Meta:
+        indexes = [
+            Index(fields=['tag', 'recipe'], name='recipetag_tag_recipe_idx'),
+        ]
         verbose_name = 'Теги'
 
     def __str__(self):
@@ -174,6 +228,9 @@ class Favorite(Model):
                 name='unique_recipe_in_user_favorite'
             )
         ]
+        indexes = [
+            Index(fields=['user', '-id'], name='favorite_user_id_idx'),
+        ]
         ordering = ('-id',)
         verbose_name = 'Избранное'
         verbose_name_plural = 'Избранные'
@@ -199,6 +256,80 @@ class ShoppingList(Model):
                 name='unique_recipe_in_user_shopping_list'
             )
         ]
+        indexes = [
+            Index(fields=['user', '-id'], name='shoppinglist_user_id_idx'),
+        ]
         ordering = ('-id',)
         verbose_name = 'Список покупок'
         verbose_name_plural = 'Списки покупок'
+
+
+class ShoppingListExport(Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    ]
+
+    FORMAT_CHOICES = [
+        ('txt', 'TXT'),
+        ('csv', 'CSV'),
+        ('json', 'JSON'),
+        ('pdf', 'PDF'),
+    ]
+
+    user = ForeignKey(
+        User,
+        on_delete=CASCADE,
+        related_name='shopping_list_exports',
+        verbose_name='Пользователь'
+    )
+    file_format = CharField(
+        verbose_name='Формат',
+        max_length=4,
+        choices=FORMAT_CHOICES
+    )
+    digest = CharField(
+        verbose_name='Хеш содержимого',
+        max_length=40,
+        blank=True
+    )
+    status = CharField(
+        verbose_name='Статус',
+        max_length=7,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    file = FileField(
+        verbose_name='Файл',
+        upload_to='exports/',
+        blank=True
+    )
+    error = TextField(
+        verbose_name='Ошибка',
+        blank=True
+    )
+    created = DateTimeField(
+        verbose_name='Создан',
+        auto_now_add=True
+    )
+    finished = DateTimeField(
+        verbose_name='Завершён',
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        indexes = [
+            Index(fields=['digest', 'status'],
+                  name='export_digest_status_idx'),
+        ]
+        ordering = ('-id',)
+        verbose_name = 'Выгрузка списка покупок'
+        verbose_name_plural = 'Выгрузки списков покупок'
@@ -0,0 +1,77 @@
+import gzip
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+
+from .models import Ingredient, Tag
+from .serializers import IngredientsSerializer, TagsSerializer
+
+
+class CachedPayload:
+    def __init__(self, model, serializer_class, ttl=300):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._payload = None
+
+    def invalidate(self):
+        with self._lock:
+            self._payload = None
+
+    def get(self):
+        with self._lock:
+            payload = self._payload
+            if payload is None or time.monotonic() > payload['expires']:
+                data = self.serializer_class(
+                    self.model.objects.all(), many=True).data
+                body = JSONRenderer().render(data)
+                digest = hashlib.sha1(body).hexdigest()
+                payload = {
+                    'body': body,
+                    'gzip': None,
+                    'etag': f'"{digest}"',
+                    'gzip_etag': f'"{digest}-gz"',
+                    'expires': time.monotonic() + self.ttl,
+                }
+                self._payload = payload
+            return payload
+
+    def get_gzip(self, payload):
+        if payload['gzip'] is None:
+            payload['gzip'] = gzip.compress(payload['body'])
+        return payload['gzip']
+
+
+def cached_payload_response(request, cached_payload):
+    payload = cached_payload.get()
+    use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    etag = payload['gzip_etag'] if use_gzip else payload['etag']
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'public, max-age={settings.CATALOG_MAX_AGE}',
+    }
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in parse_etags(if_none_match) or if_none_match == '*':
+        response = HttpResponseNotModified()
+    elif use_gzip:
+        response = HttpResponse(cached_payload.get_gzip(payload),
+                                content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(payload['body'],
+                                content_type='application/json')
+    for header, value in headers.items():
+        response[header] = value
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+tags_payload = CachedPayload(Tag, TagsSerializer)
+ingredients_payload = CachedPayload(Ingredient, IngredientsSerializer)
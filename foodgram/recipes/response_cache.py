@@ -0,0 +1,103 @@
+import hashlib
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from foodgram.metrics import registry
+from rest_framework import status
+from rest_framework.response import Response
+
+response_cache_total = registry.counter(
+    'foodgram_response_cache_total',
+    'Anonymous responses by cache outcome.', ('cache', 'result'))
+
+
+class ResponseCache:
+    def __init__(self, alias, ttl, stale_ttl=30, lock_timeout=5,
+                 max_wait=1.0, poll_interval=0.05):
+        self.alias = alias
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self.counters = {'hit': 0, 'stale': 0, 'miss': 0}
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def count(self, outcome):
+        with self._lock:
+            self.counters[outcome] += 1
+        response_cache_total.inc(cache=self.alias, result=outcome)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def get_generation(self):
+        return self.cache.get_or_set('generation', 0, None)
+
+    def bump_generation(self):
+        try:
+            self.cache.incr('generation')
+        except ValueError:
+            self.cache.set('generation', 1, None)
+
+    def make_key(self, request):
+        params = urlencode(sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            for value in values
+        ))
+        raw_key = f'{request.path}?{params}'
+        digest = hashlib.md5(raw_key.encode()).hexdigest()
+        return f'response:{self.get_generation()}:{digest}'
+
+    def respond(self, data, outcome):
+        self.count(outcome)
+        return Response(data, headers={'X-Cache': outcome.upper()})
+
+    def wait_for(self, key):
+        deadline = time.monotonic() + self.max_wait
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry
+        return None
+
+    def get_response(self, request, render):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return render()
+        key = self.make_key(request)
+        entry = self.cache.get(key)
+        if entry is not None and entry['expires'] > time.time():
+            return self.respond(entry['data'], 'hit')
+        lock_key = f'{key}:lock'
+        acquired = self.cache.add(lock_key, 1, self.lock_timeout)
+        if not acquired:
+            if entry is None:
+                entry = self.wait_for(key)
+            if entry is not None:
+                return self.respond(entry['data'], 'stale')
+        try:
+            response = render()
+            if response.status_code == status.HTTP_200_OK:
+                self.cache.set(key, {
+                    'data': response.data,
+                    'expires': time.time() + self.ttl,
+                }, self.ttl + self.stale_ttl)
+        finally:
+            if acquired:
+                self.cache.delete(lock_key)
+        self.count('miss')
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+recipes_cache = ResponseCache('recipes', settings.RECIPES_CACHE_TTL)
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connection
+from django.db.models import (Case, Exists, F, IntegerField, OuterRef, Q,
+                              Subquery, Value, When)
+from django.db.models.functions import Coalesce
+
+from .models import Recipe, RecipeIngredient
+
+
+def search_document(recipe_ingredient_model):
+    config = settings.SEARCH_CONFIG
+    ingredient_names = Subquery(
+        recipe_ingredient_model.objects.filter(
+            recipe=OuterRef('pk')
+        ).order_by().values('recipe').annotate(
+            names=StringAgg('ingredient__name', ' ')
+        ).values('names')
+    )
+    return (
+        SearchVector('name', weight='A', config=config)
+        + SearchVector(Coalesce(ingredient_names, Value('')),
+                       weight='B', config=config)
+        + SearchVector('text', weight='C', config=config)
+    )
+
+
+def update_search_vector(recipe_ids):
+    if connection.vendor != 'postgresql':
+        return
+    Recipe.objects.filter(pk__in=recipe_ids).update(
+        search_vector=search_document(RecipeIngredient))
+
+
+def search_recipes(queryset, value):
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(value, config=settings.SEARCH_CONFIG,
+                            search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', '-id')
+    condition = Q()
+    for word in value.split():
+        condition &= (
+            Q(name__icontains=word)
+            | Q(text__icontains=word)
+            | Q(Exists(RecipeIngredient.objects.filter(
+                recipe=OuterRef('pk'), ingredient__name__icontains=word)))
+        )
+    return queryset.filter(condition).annotate(
+        rank=Case(When(name__icontains=value, then=Value(1)),
+                  default=Value(0), output_field=IntegerField())
+    ).order_by('-rank', '-id')
@@ -1,25 +1,33 @@
+import json
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import F
-from django.shortcuts import get_object_or_404
-from drf_extra_fields.fields import Base64ImageField
-from rest_framework.serializers import (IntegerField, ModelSerializer,
+from django.db import transaction
+from django.http import QueryDict
+from django.urls import reverse
+from foodgram.timing import TimedSerializerMixin
+from rest_framework.serializers import (ChoiceField, IntegerField, ListField,
+                                        ModelSerializer,
                                         PrimaryKeyRelatedField, ReadOnlyField,
-                                        SerializerMethodField, ValidationError)
+                                        Serializer, SerializerMethodField,
+                                        ValidationError)
 from users.serializers import CustomUserSerializer
 
+from .fields import Base64ImageStreamField
+from .images import schedule_image_variants
 from .models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                     ShoppingList, Tag)
+                     RecipeTag, ShoppingList, ShoppingListExport, Tag)
 
 User = get_user_model()
 
 
-class IngredientsSerializer(ModelSerializer):
+class IngredientsSerializer(TimedSerializerMixin, ModelSerializer):
     class Meta:
         model = Ingredient
         fields = ('id', 'name', 'measurement_unit')
 
 
-class TagsSerializer(ModelSerializer):
+class TagsSerializer(TimedSerializerMixin, ModelSerializer):
     class Meta:
         model = Tag
         fields = ('id', 'name', 'color', 'slug')
@@ -36,13 +44,14 @@ class ShowRecipeIngredientsSerializer(ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
 
-class ShowRecipeSerializer(ModelSerializer):
+class ShowRecipeSerializer(TimedSerializerMixin, ModelSerializer):
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'thumbnail', 'thumbnail_webp',
+                  'image_webp', 'cooking_time')
 
 
-class ShowRecipeFullSerializer(ModelSerializer):
+class ShowRecipeFullSerializer(TimedSerializerMixin, ModelSerializer):
     tags = TagsSerializer(many=True, read_only=True)
     author = CustomUserSerializer(read_only=True)
     ingredients = SerializerMethodField()
@@ -52,29 +61,34 @@ class ShowRecipeFullSerializer(ModelSerializer):
     class Meta:
         model = Recipe
         fields = ('id', 'tags', 'author', 'ingredients', 'name',
-                  'image', 'text', 'cooking_time', 'is_favorited',
+                  'image', 'thumbnail', 'thumbnail_webp', 'image_webp',
+                  'text', 'cooking_time', 'is_favorited',
                   'is_in_shopping_cart')
 
     def get_ingredients(self, obj):
-        ingredients = RecipeIngredient.objects.filter(recipe=obj)
+        ingredients = obj.recipeingredient_set.all()
         return ShowRecipeIngredientsSerializer(ingredients, many=True).data
 
     def get_is_favorited(self, obj):
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         return Favorite.objects.filter(recipe=obj, user=request.user).exists()
 
     def get_is_in_shopping_cart(self, obj):
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         return ShoppingList.objects.filter(recipe=obj,
                                            user=request.user).exists()
 
 
 class AddRecipeIngredientsSerializer(ModelSerializer):
-    id = PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = IntegerField()
     amount = IntegerField()
 
     class Meta:
@@ -83,13 +97,10 @@ class AddRecipeIngredientsSerializer(ModelSerializer):
 
 
 class AddRecipeSerializer(ModelSerializer):
-    image = Base64ImageField()
+    image = Base64ImageStreamField()
     author = CustomUserSerializer(read_only=True)
     ingredients = AddRecipeIngredientsSerializer(many=True)
-    tags = PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(),
-        many=True
-    )
+    tags = ListField(child=IntegerField())
     cooking_time = IntegerField()
 
     class Meta:
@@ -97,29 +108,57 @@ class AddRecipeSerializer(ModelSerializer):
         fields = ('id', 'tags', 'author', 'ingredients', 'name',
                   'image', 'text', 'cooking_time')
 
+    def save(self, **kwargs):
+        try:
+            return super().save(**kwargs)
+        finally:
+            image = self.validated_data.get('image')
+            if image is not None:
+                image.close()
+
+    def to_internal_value(self, data):
+        if isinstance(data, QueryDict):
+            values = data
+            data = values.dict()
+            for field in ('ingredients', 'tags'):
+                if len(values.getlist(field)) > 1:
+                    data[field] = values.getlist(field)
+                elif field in data:
+                    try:
+                        data[field] = json.loads(data[field])
+                    except ValueError:
+                        raise ValidationError({
+                            field: 'Ожидается JSON-список'})
+        return super().to_internal_value(data)
+
     def validate_ingredients(self, data):
-        ingredients = self.initial_data.get('ingredients')
-        if not ingredients:
+        if not data:
             raise ValidationError({
                 'ingredients': 'Нужен хоть один ингридиент для рецепта'})
-        ingredient_list = []
-        for ingredient_item in ingredients:
-            ingredient = get_object_or_404(Ingredient,
-                                           id=ingredient_item['id'])
-            if ingredient in ingredient_list:
-                raise ValidationError('Ингридиенты должны быть уникальными')
-            ingredient_list.append(ingredient)
-            if int(ingredient_item['amount']) < 0:
-                raise ValidationError({
-                    'ingredients': ('Убедитесь, что значение количества '
-                                    'ингредиента больше 0')
-                })
+        ingredient_ids = {item['id'] for item in data}
+        if len(ingredient_ids) != len(data):
+            raise ValidationError('Ингридиенты должны быть уникальными')
+        if any(item['amount'] <= 0 for item in data):
+            raise ValidationError({
+                'ingredients': ('Убедитесь, что значение количества '
+                                'ингредиента больше 0')
+            })
+        found = Ingredient.objects.in_bulk(ingredient_ids)
+        if len(found) != len(ingredient_ids):
+            missing = sorted(ingredient_ids - found.keys())
+            raise ValidationError({
+                'ingredients': f'Ингридиенты не найдены: {missing}'})
         return data
 
     def validate_tags(self, data):
         if not data:
             raise ValidationError('Теги не могут быть пустыми!')
-        return data
+        tag_ids = list(dict.fromkeys(data))
+        found = Tag.objects.in_bulk(tag_ids)
+        if len(found) != len(tag_ids):
+            missing = sorted(set(tag_ids) - found.keys())
+            raise ValidationError(f'Теги не найдены: {missing}')
+        return tag_ids
 
     def validate_cooking_time(self, data):
         if data <= 0:
@@ -128,39 +167,46 @@ class AddRecipeSerializer(ModelSerializer):
         return data
 
     def add_recipe_ingredients(self, ingredients, recipe):
-        for ingredient in ingredients:
-            ingredient_id = ingredient['id']
-            amount = ingredient['amount']
-            if (RecipeIngredient.objects.
-               filter(recipe=recipe, ingredient=ingredient_id).exists()):
-                amount += F('amount')
-            RecipeIngredient.objects.update_or_create(
-                recipe=recipe, ingredient=ingredient_id,
-                defaults={'amount': amount})
-
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient_id=ingredient['id'],
+                             amount=ingredient['amount'])
+            for ingredient in ingredients
+        )
+
+    def add_recipe_tags(self, tags, recipe):
+        RecipeTag.objects.bulk_create(
+            RecipeTag(recipe=recipe, tag_id=tag_id) for tag_id in tags
+        )
+
+    @transaction.atomic
     def create(self, validated_data):
         author = self.context.get('request').user
         tags_data = validated_data.pop('tags')
         ingredients_data = validated_data.pop('ingredients')
         recipe = Recipe.objects.create(author=author, **validated_data)
         self.add_recipe_ingredients(ingredients_data, recipe)
-        recipe.tags.set(tags_data)
+        self.add_recipe_tags(tags_data, recipe)
+        schedule_image_variants(recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, recipe, validated_data):
         recipe.name = validated_data.get('name', recipe.name)
         recipe.text = validated_data.get('text', recipe.text)
         recipe.cooking_time = validated_data.get('cooking_time',
                                                  recipe.cooking_time)
         recipe.image = validated_data.get('image', recipe.image)
-        if 'ingredients' in self.initial_data:
+        if 'ingredients' in validated_data:
             ingredients = validated_data.pop('ingredients')
-            recipe.ingredients.clear()
+            RecipeIngredient.objects.filter(recipe=recipe).delete()
             self.add_recipe_ingredients(ingredients, recipe)
-        if 'tags' in self.initial_data:
+        if 'tags' in validated_data:
             tags_data = validated_data.pop('tags')
-            recipe.tags.set(tags_data)
-        recipe.save()
+            RecipeTag.objects.filter(recipe=recipe).delete()
+            self.add_recipe_tags(tags_data, recipe)
+        recipe.save(update_fields=('name', 'text', 'cooking_time', 'image'))
+        if 'image' in validated_data:
+            schedule_image_variants(recipe)
         return recipe
 
     def to_representation(self, recipe):
@@ -210,3 +256,30 @@ class ShoppingListSerializer(ModelSerializer):
         request = self.context.get('request')
         context = {'request': request}
         return ShowRecipeSerializer(instance.recipe, context=context).data
+
+
+class ShoppingListExportSerializer(ModelSerializer):
+    format = ChoiceField(source='file_format',
+                         choices=ShoppingListExport.FORMAT_CHOICES)
+    download = SerializerMethodField()
+
+    class Meta:
+        model = ShoppingListExport
+        fields = ('id', 'format', 'status', 'error', 'created', 'finished',
+                  'download')
+        read_only_fields = ('status', 'error', 'created', 'finished')
+
+    def get_download(self, obj):
+        if obj.status != ShoppingListExport.DONE:
+            return None
+        request = self.context.get('request')
+        return request.build_absolute_uri(
+            reverse('shopping_list_exports-download', args=[obj.id]))
+
+
+class BulkIdsSerializer(Serializer):
+    ids = ListField(child=IntegerField(min_value=1), allow_empty=False,
+                    max_length=settings.BULK_MAX_IDS)
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .counters import COUNTERS, update_counters
+from .ingredient_index import ingredient_index
+from .models import Ingredient, Recipe, Tag
+from .payloads import ingredients_payload, tags_payload
+from .response_cache import recipes_cache
+from .search import update_search_vector
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredient_index(sender, **kwargs):
+    ingredient_index.invalidate()
+    ingredients_payload.invalidate()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags_payload(sender, **kwargs):
+    tags_payload.invalidate()
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipes_cache(sender, **kwargs):
+    transaction.on_commit(recipes_cache.bump_generation)
+
+
+def increment_counters(sender, instance, created, **kwargs):
+    if created:
+        update_counters(sender, instance, 1)
+
+
+def decrement_counters(sender, instance, **kwargs):
+    update_counters(sender, instance, -1)
+
+
+for sender in {related_model for _, _, related_model, _ in COUNTERS}:
+    post_save.connect(increment_counters, sender=sender)
+    post_delete.connect(decrement_counters, sender=sender)
+
+
+SEARCH_FIELDS = {'name', 'text'}
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search_vector(sender, instance, raw=False,
+                                update_fields=None, **kwargs):
+    if raw or (update_fields is not None
+               and not SEARCH_FIELDS & set(update_fields)):
+        return
+    transaction.on_commit(lambda: update_search_vector([instance.id]))
@@ -0,0 +1,75 @@
+import tempfile
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from recipes.ingredient_index import ingredient_index
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            RecipeTag, ShoppingList, Tag)
+from recipes.payloads import ingredients_payload, tags_payload
+from rest_framework.test import APIClient
+from users.models import Follow, User
+
+PNG = ('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABAgMAAABieywaAAAACVBMVEUAAAD///9fX1/'
+       'S0ecCAAAACXBIWXMAAA7EAAAOxAGVKw4bAAAACklEQVQImWNoAAAAggCByxOyYQAAAA'
+       'BJRU5ErkJggg==')
+
+
+def create_user(name, **kwargs):
+    return User.objects.create_user(
+        email=f'{name}@example.com', username=name, first_name=name,
+        last_name=name, password='password', **kwargs)
+
+
+class TemporaryMediaMixin:
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.media_root = directory.name
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class FoodgramTestCase(TestCase):
+    recipes_count = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.author = create_user('author')
+        cls.tags = [Tag.objects.create(name=f'tag{number}',
+                                       slug=f'tag{number}', color=Tag.BLUE)
+                    for number in range(3)]
+        cls.ingredients = [
+            Ingredient.objects.create(name=f'ingredient{number}',
+                                      measurement_unit='g')
+            for number in range(5)
+        ]
+        cls.recipes = []
+        for number in range(cls.recipes_count):
+            recipe = Recipe.objects.create(
+                name=f'recipe{number}',
+                author=cls.author if number % 2 else cls.user,
+                text='text', cooking_time=5, image='recipes/test.png')
+            for ingredient in cls.ingredients[:3]:
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=number + 1)
+            RecipeTag.objects.create(recipe=recipe,
+                                     tag=cls.tags[number % 3])
+            if number % 3 == 0:
+                Favorite.objects.create(user=cls.user, recipe=recipe)
+                ShoppingList.objects.create(user=cls.user, recipe=recipe)
+            cls.recipes.append(recipe)
+        Follow.objects.create(user=cls.user, following=cls.author)
+
+    def setUp(self):
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        tags_payload.invalidate()
+        ingredients_payload.invalidate()
+        ingredient_index.invalidate()
+        self.anonymous = APIClient()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
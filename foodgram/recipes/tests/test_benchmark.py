@@ -0,0 +1,52 @@
+import json
+import os
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from users.models import User
+
+from .base import TemporaryMediaMixin
+
+
+class BenchmarkCommandTests(TemporaryMediaMixin, TestCase):
+    def test_seed_data_is_repeatable(self):
+        for _ in range(2):
+            call_command('seed_data', users=3, recipes_per_user=2,
+                         stdout=StringIO())
+        self.assertEqual(User.objects.count(), 6)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.media_root, 'recipes', 'seed.png')))
+
+    def test_benchmark_leaves_data_untouched(self):
+        call_command('seed_data', users=3, recipes_per_user=2,
+                     follows_per_user=2, stdout=StringIO())
+        passwords = dict(User.objects.values_list('id', 'password'))
+        baseline = os.path.join(self.media_root, 'baseline.json')
+        output = StringIO()
+        call_command('benchmark', repeat=1, warmup=0, baseline=baseline,
+                     update_baseline=True, only='recipes-list',
+                     stdout=output)
+        self.assertIn('recipes-list', output.getvalue())
+        self.assertTrue(os.path.exists(baseline))
+        self.assertEqual(
+            dict(User.objects.values_list('id', 'password')), passwords)
+        self.assertFalse(User.objects.filter(auth_token__isnull=False))
+
+    def test_benchmark_covers_all_endpoints(self):
+        call_command('seed_data', users=3, recipes_per_user=2,
+                     follows_per_user=2, stdout=StringIO())
+        baseline = os.path.join(self.media_root, 'baseline.json')
+        call_command('benchmark', repeat=1, warmup=0, baseline=baseline,
+                     update_baseline=True, stdout=StringIO())
+        with open(baseline, encoding='utf-8') as file:
+            results = json.load(file)['default']
+        for name in ('users-create', 'recipes-bulk-favorite',
+                     'recipes-bulk-shopping-cart', 'users-bulk-subscribe',
+                     'shopping-list-exports-create',
+                     'shopping-list-exports-detail',
+                     'shopping-list-exports-download'):
+            self.assertIn(name, results)
+        for name, result in results.items():
+            with self.subTest(endpoint=name):
+                self.assertLess(result['status'], 400)
@@ -0,0 +1,72 @@
+from django.conf import settings
+from recipes.models import Favorite, Recipe, ShoppingList
+from users.models import Follow, User
+
+from .base import FoodgramTestCase, create_user
+
+
+class BulkEndpointTests(FoodgramTestCase):
+    def test_bulk_recipes(self):
+        existing, new = self.recipes[0], self.recipes[1]
+        ids = [existing.id, new.id, 99999, new.id]
+        for url, model, counter in (
+                ('favorite', Favorite, 'favorites_count'),
+                ('shopping_cart', ShoppingList, 'in_carts_count')):
+            with self.subTest(url=url):
+                response = self.client.post(f'/api/recipes/{url}/',
+                                            {'ids': ids}, format='json')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    [(item['id'], item['status']) for item in response.data],
+                    [(existing.id, 'exists'), (new.id, 'created'),
+                     (99999, 'not_found')])
+                self.assertEqual(response.data[1]['recipe']['name'],
+                                 new.name)
+                self.assertTrue(model.objects.filter(
+                    user=self.user, recipe=new).exists())
+                self.assertEqual(getattr(
+                    Recipe.objects.get(pk=new.pk), counter), 1)
+
+    def test_bulk_subscribe(self):
+        other = create_user('other')
+        ids = [self.author.id, other.id, self.user.id, 99999]
+        response = self.client.post('/api/users/subscribe/', {'ids': ids},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [
+            {'id': self.author.id, 'status': 'exists'},
+            {'id': other.id, 'status': 'created'},
+            {'id': self.user.id, 'status': 'invalid',
+             'errors': 'Нельзя подписаться на себя'},
+            {'id': 99999, 'status': 'not_found'},
+        ])
+        self.assertTrue(Follow.objects.filter(user=self.user,
+                                              following=other).exists())
+        self.assertFalse(Follow.objects.filter(user=self.user,
+                                               following=self.user).exists())
+        self.assertEqual(User.objects.get(pk=other.pk).followers_count, 1)
+        self.assertEqual(User.objects.get(pk=self.author.pk).followers_count,
+                         1)
+
+    def test_invalid_payload(self):
+        too_many = list(range(1, settings.BULK_MAX_IDS + 2))
+        for url in ('/api/recipes/favorite/', '/api/recipes/shopping_cart/',
+                    '/api/users/subscribe/'):
+            for ids in ([], too_many, ['x']):
+                with self.subTest(url=url, ids=ids[:2]):
+                    response = self.client.post(url, {'ids': ids},
+                                                format='json')
+                    self.assertEqual(response.status_code, 400)
+            with self.subTest(url=url, anonymous=True):
+                response = self.anonymous.post(url, {'ids': [1]},
+                                               format='json')
+                self.assertEqual(response.status_code, 401)
+
+    def test_query_budget(self):
+        for size in (1, 5, 12):
+            self.client.force_authenticate(create_user(f'user{size}'))
+            ids = [recipe.id for recipe in self.recipes[:size]]
+            with self.subTest(size=size), self.assertNumQueries(5):
+                response = self.client.post('/api/recipes/favorite/',
+                                            {'ids': ids}, format='json')
+                self.assertEqual(len(response.data), size)
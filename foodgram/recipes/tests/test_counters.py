@@ -0,0 +1,70 @@
+from users.models import User
+
+from .base import FoodgramTestCase
+
+
+class CounterTests(FoodgramTestCase):
+    def assertCounters(self, user, recipes_count, followers_count):
+        user = User.objects.get(pk=user.pk)
+        self.assertEqual(user.recipes_count, recipes_count)
+        self.assertEqual(user.followers_count, followers_count)
+
+    def test_initial_counters(self):
+        self.assertCounters(self.user, 6, 0)
+        self.assertCounters(self.author, 6, 1)
+        recipe = self.recipes[0]
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.favorites_count, 1)
+        self.assertEqual(recipe.in_carts_count, 1)
+
+    def test_relations_update_counters(self):
+        recipe = self.recipes[1]
+        for url in ('favorite', 'shopping_cart'):
+            response = self.client.get(f'/api/recipes/{recipe.id}/{url}/')
+            self.assertEqual(response.status_code, 201)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.favorites_count, 1)
+        self.assertEqual(recipe.in_carts_count, 1)
+        response = self.client.delete(f'/api/recipes/{recipe.id}/favorite/')
+        self.assertEqual(response.status_code, 204)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.favorites_count, 0)
+        follower = User.objects.create_user(
+            email='follower@example.com', username='follower',
+            first_name='follower', last_name='follower', password='password')
+        self.client.force_authenticate(follower)
+        response = self.client.get(f'/api/users/{self.user.id}/subscribe/')
+        self.assertEqual(response.status_code, 201)
+        self.assertCounters(self.user, 6, 1)
+
+    def test_set_password_keeps_counters(self):
+        response = self.client.post('/api/users/set_password/', {
+            'current_password': 'password',
+            'new_password': 'Xq7-long-password',
+        })
+        self.assertEqual(response.status_code, 204)
+        self.assertCounters(self.user, 6, 0)
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password(
+            'Xq7-long-password'))
+
+    def test_profile_update_keeps_counters(self):
+        response = self.client.patch('/api/users/me/', {'first_name': 'new'})
+        self.assertEqual(response.status_code, 200)
+        self.assertCounters(self.user, 6, 0)
+        self.assertEqual(User.objects.get(pk=self.user.pk).first_name, 'new')
+
+    def test_full_save_keeps_counters(self):
+        recipe = self.recipes[0]
+        self.author.first_name = 'renamed'
+        self.author.save()
+        recipe.name = 'renamed'
+        recipe.save()
+        self.assertCounters(self.author, 6, 1)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.favorites_count, 1)
+        self.assertEqual(recipe.name, 'renamed')
+
+    def test_explicit_counter_update(self):
+        self.user.recipes_count = 2
+        self.user.save(update_fields=['recipes_count'])
+        self.assertCounters(self.user, 2, 0)
@@ -0,0 +1,58 @@
+from unittest import mock
+
+from recipes import exports
+from recipes.models import ShoppingListExport
+
+from .base import FoodgramTestCase, TemporaryMediaMixin
+
+
+class ShoppingListExportTests(TemporaryMediaMixin, FoodgramTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(exports, 'schedule_export')
+        self.schedule_export = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_request_does_not_read_cart(self):
+        with self.assertNumQueries(2):
+            response = self.client.post('/api/shopping_list_exports/',
+                                        {'format': 'txt'})
+        self.assertEqual(response.status_code, 202)
+        job = ShoppingListExport.objects.get(pk=response.data['id'])
+        self.assertEqual(job.status, ShoppingListExport.PENDING)
+        self.assertEqual(job.digest, '')
+        self.schedule_export.assert_called_once_with(job)
+
+    def test_pending_job_is_reused(self):
+        first = exports.create_export(self.user, 'txt')
+        self.assertEqual(exports.create_export(self.user, 'txt'), first)
+        self.assertNotEqual(exports.create_export(self.user, 'csv'), first)
+        self.assertNotEqual(exports.create_export(self.author, 'txt'), first)
+
+    def test_worker_renders_and_reuses_file(self):
+        first = exports.create_export(self.user, 'txt')
+        exports.render_export(first)
+        first.refresh_from_db()
+        self.assertEqual(first.status, ShoppingListExport.DONE)
+        self.assertEqual(first.digest,
+                         exports.get_export_digest(self.user, 'txt'))
+        with first.file.open('rb') as file:
+            self.assertIn('ingredient0'.encode(), file.read())
+        second = exports.create_export(self.user, 'txt')
+        with mock.patch.object(exports, 'write_lines') as write_lines:
+            exports.render_export(second)
+        write_lines.assert_not_called()
+        second.refresh_from_db()
+        self.assertEqual(second.status, ShoppingListExport.DONE)
+        self.assertEqual(second.file.name, first.file.name)
+
+    def test_changed_cart_is_rendered_again(self):
+        first = exports.create_export(self.user, 'txt')
+        exports.render_export(first)
+        self.client.delete(f'/api/recipes/{self.recipes[0].id}/'
+                           'shopping_cart/')
+        second = exports.create_export(self.user, 'txt')
+        exports.render_export(second)
+        second.refresh_from_db()
+        self.assertNotEqual(second.digest, first.digest)
+        self.assertNotEqual(second.file.name, first.file.name)
@@ -0,0 +1,154 @@
+import base64
+import json
+import struct
+import zlib
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+from recipes.fields import decode_base64_image
+from recipes.models import Recipe
+from rest_framework.serializers import ValidationError
+
+from .base import PNG, FoodgramTestCase, TemporaryMediaMixin
+
+
+def make_image(size=(40, 30), file_format='PNG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 100, 50)).save(buffer, file_format)
+    return buffer.getvalue()
+
+
+def png_header(width, height):
+    def chunk(kind, data):
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data)))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height,
+                                         8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(b'\x00' * 64)))
+
+
+def encode(content):
+    return base64.b64encode(content).decode()
+
+
+class Base64DecoderTests(SimpleTestCase):
+    def assertDecodes(self, data, content, extension='png'):
+        file = decode_base64_image(data)
+        try:
+            self.assertEqual(file.read(), content)
+            self.assertEqual(file.size, len(content))
+            self.assertTrue(file.name.endswith(f'.{extension}'))
+        finally:
+            file.close()
+
+    def assertRejected(self, data, message):
+        with self.assertRaises(ValidationError) as context:
+            decode_base64_image(data)
+        self.assertIn(message, str(context.exception.detail))
+
+    def test_data_uri_and_bare_base64(self):
+        content = base64.b64decode(PNG)
+        self.assertDecodes(f'data:image/png;base64,{PNG}', content)
+        self.assertDecodes(PNG, content)
+        self.assertDecodes(encode(make_image(file_format='JPEG')),
+                           make_image(file_format='JPEG'), 'jpg')
+
+    def test_chunk_boundaries_and_whitespace(self):
+        content = make_image((300, 200))
+        encoded = encode(content)
+        wrapped = '\n'.join(encoded[offset:offset + 76]
+                            for offset in range(0, len(encoded), 76))
+        for chunk_size in (5, 7, 64, 1000):
+            with self.subTest(chunk_size=chunk_size), mock.patch(
+                    'recipes.fields.CHUNK_SIZE', chunk_size):
+                self.assertDecodes(f'data:image/png;base64,{wrapped}',
+                                   content)
+                self.assertDecodes(' \t'.join(encoded), content)
+
+    def test_bad_padding(self):
+        self.assertRejected(PNG[:-1], 'Некорректная картинка в base64')
+        self.assertRejected(PNG + 'A', 'Некорректная картинка в base64')
+
+    def test_not_an_image(self):
+        self.assertRejected(encode(b'not an image at all'),
+                            'Загрузите корректную картинку')
+        self.assertRejected(encode(make_image(file_format='BMP')),
+                            'Неподдерживаемый формат картинки')
+
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=100)
+    def test_size_limit(self):
+        self.assertRejected(encode(make_image((300, 200))),
+                            'Размер картинки превышает допустимый')
+
+    @override_settings(RECIPE_IMAGE_MAX_PIXELS=1000)
+    def test_pixel_limit(self):
+        self.assertRejected(encode(make_image((40, 30))),
+                            'Картинка слишком большая: 40x30 пикселей')
+        self.assertDecodes(encode(make_image((20, 30))),
+                           make_image((20, 30)))
+
+    def test_decompression_bomb(self):
+        self.assertRejected(encode(png_header(20000, 20000)),
+                            'Картинка слишком большая')
+
+
+class RecipeImageUploadTests(TemporaryMediaMixin, FoodgramTestCase):
+    def get_data(self, image):
+        return {
+            'ingredients': json.dumps([
+                {'id': ingredient.id, 'amount': 5}
+                for ingredient in self.ingredients[:2]]),
+            'tags': [tag.id for tag in self.tags[:2]],
+            'image': image,
+            'name': 'multipart',
+            'text': 'text',
+            'cooking_time': 5,
+        }
+
+    def test_multipart_create(self):
+        image = SimpleUploadedFile('photo.png', make_image(), 'image/png')
+        response = self.client.post('/api/recipes/', self.get_data(image),
+                                    format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+        recipe = Recipe.objects.get(pk=response.data['id'])
+        self.assertEqual(recipe.recipeingredient_set.count(), 2)
+        self.assertEqual(recipe.tags.count(), 2)
+        self.assertTrue(recipe.image.name.endswith('.png'))
+
+    def test_multipart_single_tag(self):
+        image = SimpleUploadedFile('photo.png', make_image(), 'image/png')
+        data = self.get_data(image)
+        data['tags'] = json.dumps([self.tags[0].id])
+        response = self.client.post('/api/recipes/', data,
+                                    format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def test_multipart_invalid_json(self):
+        image = SimpleUploadedFile('photo.png', make_image(), 'image/png')
+        data = self.get_data(image)
+        data['ingredients'] = 'not json'
+        response = self.client.post('/api/recipes/', data,
+                                    format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ingredients', response.data)
+
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=100)
+    def test_multipart_size_limit(self):
+        image = SimpleUploadedFile('photo.png', make_image(), 'image/png')
+        response = self.client.post('/api/recipes/', self.get_data(image),
+                                    format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('image', response.data)
+
+    def test_decompression_bomb_is_bad_request(self):
+        data = self.get_data(encode(png_header(20000, 20000)))
+        data['ingredients'] = json.loads(data['ingredients'])
+        response = self.client.post('/api/recipes/', data, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['image'],
+                         ['Картинка слишком большая'])
@@ -0,0 +1,50 @@
+from recipes.models import RecipeTag, Tag
+
+from .base import FoodgramTestCase
+
+
+class RecipeFilterTests(FoodgramTestCase):
+    def get_names(self, query, client=None):
+        response = (client or self.client).get(
+            f'/api/recipes/?limit=50&{query}')
+        self.assertEqual(response.status_code, 200)
+        return {recipe['name'] for recipe in response.data['results']}
+
+    def test_tags(self):
+        self.assertEqual(self.get_names('tags=tag0'),
+                         {'recipe0', 'recipe3', 'recipe6', 'recipe9'})
+        self.assertEqual(len(self.get_names('tags=tag0&tags=tag1')), 8)
+
+    def test_unknown_tag(self):
+        response = self.client.get('/api/recipes/?tags=missing')
+        self.assertEqual(response.status_code, 400)
+
+    def test_new_tag_is_accepted(self):
+        self.get_names('tags=tag0')
+        tag = Tag.objects.create(name='new', slug='new', color=Tag.GREEN)
+        RecipeTag.objects.create(recipe=self.recipes[0], tag=tag)
+        self.assertEqual(self.get_names('tags=new'), {'recipe0'})
+
+    def test_tag_query_budget(self):
+        for limit in (2, 10):
+            with self.subTest(limit=limit), self.assertNumQueries(6):
+                response = self.client.get(
+                    f'/api/recipes/?limit={limit}&tags=tag0&tags=tag1')
+                self.assertEqual(response.status_code, 200)
+
+    def test_user_relations(self):
+        favorites = {'recipe0', 'recipe3', 'recipe6', 'recipe9'}
+        self.assertEqual(self.get_names('is_favorited=1'), favorites)
+        self.assertEqual(self.get_names('is_in_shopping_cart=1'), favorites)
+        self.assertEqual(self.get_names('is_favorited=0'),
+                         {recipe.name for recipe in self.recipes})
+        self.assertEqual(self.get_names('is_favorited=1', self.anonymous),
+                         set())
+
+    def test_author(self):
+        self.assertEqual(self.get_names(f'author={self.author.id}'),
+                         {f'recipe{number}' for number in range(1, 12, 2)})
+
+    def test_search(self):
+        self.assertEqual(self.get_names('search=recipe1'),
+                         {'recipe1', 'recipe10', 'recipe11'})
@@ -0,0 +1,121 @@
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from PIL import Image
+from recipes.images import (generate_image_variants, process_recipe_image,
+                            schedule_image_variants)
+
+from .base import PNG, FoodgramTestCase, TemporaryMediaMixin
+
+
+def make_image(mode, size=(1000, 800), file_format='PNG'):
+    color = {'P': 3, 'L': 128, 'RGBA': (200, 100, 50, 128)}.get(
+        mode, (200, 100, 50))
+    buffer = BytesIO()
+    Image.new(mode, size, color).save(buffer, file_format)
+    return ContentFile(buffer.getvalue())
+
+
+class ImageVariantTests(TemporaryMediaMixin, FoodgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.recipes[0]
+
+    def set_image(self, mode, file_format='PNG'):
+        extension = file_format.lower()
+        self.recipe.image.save(f'source.{extension}',
+                               make_image(mode, file_format=file_format),
+                               save=False)
+        self.recipe.save(update_fields=['image'])
+
+    def open_variant(self, field):
+        with getattr(self.recipe, field).open('rb') as file:
+            image = Image.open(file)
+            image.load()
+        return image
+
+    def test_variants(self):
+        self.set_image('RGB', 'JPEG')
+        generate_image_variants(self.recipe)
+        self.recipe.refresh_from_db()
+        for field, file_format, size in (
+                ('thumbnail', 'JPEG', (480, 320)),
+                ('thumbnail_webp', 'WEBP', (480, 320)),
+                ('image_webp', 'WEBP', (1000, 800))):
+            with self.subTest(field=field):
+                image = self.open_variant(field)
+                self.assertEqual(image.format, file_format)
+                self.assertEqual(image.size, size)
+
+    def test_palette_and_transparent_sources(self):
+        for mode, webp_mode in (('P', 'RGB'), ('RGBA', 'RGBA'),
+                                ('L', 'RGB')):
+            with self.subTest(mode=mode):
+                self.set_image(mode)
+                generate_image_variants(self.recipe)
+                self.assertEqual(self.open_variant('thumbnail').mode, 'RGB')
+                self.assertEqual(self.open_variant('image_webp').mode,
+                                 webp_mode)
+
+    def test_regeneration_replaces_files(self):
+        self.set_image('RGB')
+        for _ in range(2):
+            generate_image_variants(self.recipe)
+        storage = self.recipe.thumbnail.storage
+        self.assertEqual(sorted(storage.listdir('recipes/thumbnails')[1]),
+                         ['source.jpg', 'source.webp'])
+        self.assertEqual(storage.listdir('recipes/webp')[1],
+                         ['source.webp'])
+
+    def test_missing_recipe_is_ignored(self):
+        with mock.patch('recipes.images.connections'), \
+                mock.patch('recipes.images.generate_image_variants') as run:
+            process_recipe_image(99999)
+        run.assert_not_called()
+
+    def test_scheduled_on_commit(self):
+        with mock.patch('recipes.images.executor') as executor:
+            with self.captureOnCommitCallbacks() as callbacks:
+                schedule_image_variants(self.recipe)
+            executor.submit.assert_not_called()
+            for callback in callbacks:
+                callback()
+            executor.submit.assert_called_once_with(process_recipe_image,
+                                                    self.recipe.id)
+
+    def test_recipe_create_schedules_variants(self):
+        data = {
+            'ingredients': [{'id': self.ingredients[0].id, 'amount': 1}],
+            'tags': [self.tags[0].id],
+            'image': f'data:image/png;base64,{PNG}',
+            'name': 'new', 'text': 'text', 'cooking_time': 1,
+        }
+        with mock.patch('recipes.images.executor') as executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post('/api/recipes/', data,
+                                            format='json')
+        self.assertEqual(response.status_code, 201)
+        executor.submit.assert_called_once_with(process_recipe_image,
+                                                response.data['id'])
+
+    def test_serializer_urls(self):
+        response = self.client.get(f'/api/recipes/{self.recipe.id}/')
+        for field in ('thumbnail', 'thumbnail_webp', 'image_webp'):
+            self.assertIsNone(response.data[field])
+        self.set_image('RGB')
+        generate_image_variants(self.recipe)
+        response = self.client.get(f'/api/recipes/{self.recipe.id}/')
+        for field, path in (('thumbnail', '/media/recipes/thumbnails/'),
+                            ('thumbnail_webp', '/media/recipes/thumbnails/'),
+                            ('image_webp', '/media/recipes/webp/')):
+            with self.subTest(field=field):
+                self.assertTrue(response.data[field].startswith(
+                    f'http://testserver{path}'), response.data[field])
+        self.assertTrue(response.data['thumbnail'].endswith('.jpg'))
+        self.assertTrue(response.data['image_webp'].endswith('.webp'))
+        thumbnail = response.data['thumbnail']
+        response = self.client.get('/api/recipes/?limit=50')
+        recipe = next(item for item in response.data['results']
+                      if item['id'] == self.recipe.id)
+        self.assertEqual(recipe['thumbnail'], thumbnail)
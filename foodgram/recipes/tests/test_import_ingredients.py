@@ -0,0 +1,133 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from recipes.management.commands.import_ingredients import iter_json
+from recipes.models import Ingredient
+
+
+class IterJsonTests(TestCase):
+    def parse(self, text, read_size=3):
+        with mock.patch('recipes.management.commands.import_ingredients.'
+                        'READ_SIZE', read_size):
+            return list(iter_json(io.StringIO(text)))
+
+    def test_objects_across_reads(self):
+        rows = [{'name': f'соль [{number}], крупная',
+                 'measurement_unit': 'г'} for number in range(5)]
+        text = json.dumps(rows, ensure_ascii=False, indent=2)
+        for read_size in (1, 3, 64, 65536):
+            with self.subTest(read_size=read_size):
+                self.assertEqual(self.parse(text, read_size), rows)
+
+    def test_fixture_format(self):
+        text = json.dumps([{'model': 'recipes.ingredient', 'pk': 1,
+                            'fields': {'name': 'мука',
+                                       'measurement_unit': 'г'}}])
+        self.assertEqual(self.parse(text),
+                         [{'name': 'мука', 'measurement_unit': 'г'}])
+
+    def test_empty(self):
+        self.assertEqual(self.parse('[]'), [])
+        self.assertEqual(self.parse(' \n'), [])
+
+    def test_invalid(self):
+        with self.assertRaises(CommandError):
+            self.parse('[{"name": "мука", ')
+
+
+class ImportIngredientsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def write_json(self, rows, name='ingredients.json'):
+        return self.write(name, json.dumps(rows, ensure_ascii=False))
+
+    def run_command(self, path, **options):
+        options.setdefault('method', 'bulk')
+        output = io.StringIO()
+        call_command('import_ingredients', path, stdout=output, **options)
+        return output.getvalue()
+
+    def ingredients(self):
+        return set(Ingredient.objects.values_list('name',
+                                                  'measurement_unit'))
+
+    def test_json_with_duplicates(self):
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+        path = self.write_json([
+            {'name': 'соль', 'measurement_unit': 'г'},
+            {'name': ' мука ', 'measurement_unit': 'г'},
+            {'name': 'мука', 'measurement_unit': 'г'},
+            {'name': 'мука', 'measurement_unit': 'кг'},
+            {'name': 'сахар', 'measurement_unit': 'г'},
+        ])
+        output = self.run_command(path, batch_size=2)
+        self.assertIn('прочитано 5, повторов во входных данных 1, '
+                      'уже в базе 1, новых 3', output)
+        self.assertEqual(self.ingredients(), {
+            ('соль', 'г'), ('мука', 'г'), ('мука', 'кг'), ('сахар', 'г')})
+
+    def test_csv(self):
+        path = self.write('ingredients.csv',
+                          'name,measurement_unit\r\nмука,г\r\n'
+                          '"соль, морская",г\r\n')
+        self.run_command(path)
+        self.assertEqual(self.ingredients(),
+                         {('мука', 'г'), ('соль, морская', 'г')})
+
+    def test_rerun_is_idempotent(self):
+        path = self.write_json([{'name': 'мука', 'measurement_unit': 'г'}])
+        self.run_command(path)
+        output = self.run_command(path)
+        self.assertIn('уже в базе 1, новых 0', output)
+        self.assertEqual(Ingredient.objects.count(), 1)
+
+    def test_dry_run(self):
+        path = self.write_json([{'name': 'мука', 'measurement_unit': 'г'}])
+        output = self.run_command(path, dry_run=True)
+        self.assertIn('новых 1', output)
+        self.assertFalse(Ingredient.objects.exists())
+
+    def test_search_sees_imported_rows(self):
+        self.client.get('/api/ingredients/', {'name': 'мук'})
+        path = self.write_json([{'name': 'мука', 'measurement_unit': 'г'}])
+        self.run_command(path)
+        response = self.client.get('/api/ingredients/', {'name': 'мук'})
+        self.assertEqual([item['name'] for item in response.json()],
+                         ['мука'])
+
+    def test_invalid_rows(self):
+        for rows, message in (
+                (['мука'], 'Строка 1: ожидается объект'),
+                ([{'name': 'мука', 'measurement_unit': 'г'}, [1]],
+                 'Строка 2: ожидается объект'),
+                ([{'name': 'мука'}], 'нужны поля name и measurement_unit'),
+                ([{'name': 1, 'measurement_unit': 'г'}],
+                 'нужны поля name и measurement_unit')):
+            with self.subTest(rows=rows):
+                with self.assertRaisesMessage(CommandError, message):
+                    self.run_command(self.write_json(rows))
+        self.assertFalse(Ingredient.objects.exists())
+
+    def test_invalid_options(self):
+        with self.assertRaisesMessage(CommandError, 'JSON и CSV'):
+            self.run_command(self.write('ingredients.txt', ''))
+        with self.assertRaisesMessage(CommandError, 'Не удалось прочитать'):
+            self.run_command(os.path.join(self.directory, 'missing.json'))
+        if connection.vendor != 'postgresql':
+            with self.assertRaisesMessage(CommandError, 'только PostgreSQL'):
+                self.run_command(self.write_json([]), method='copy')
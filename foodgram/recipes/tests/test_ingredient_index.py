@@ -0,0 +1,52 @@
+from django.test import override_settings
+from recipes.models import Ingredient
+
+from .base import FoodgramTestCase
+
+
+class IngredientSearchTests(FoodgramTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for name in ('Морская соль', 'соль поваренная', 'Соль', 'Сахар'):
+            Ingredient.objects.create(name=name, measurement_unit='г')
+
+    def search(self, name):
+        response = self.anonymous.get('/api/ingredients/', {'name': name})
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.data]
+
+    def test_prefix_before_contains(self):
+        self.assertEqual(self.search('соль'),
+                         ['Соль', 'соль поваренная', 'Морская соль'])
+
+    def test_case_insensitive(self):
+        self.assertEqual(self.search('СОЛЬ П'), ['соль поваренная'])
+        self.assertEqual(self.search('сах'), ['Сахар'])
+
+    def test_result_fields(self):
+        response = self.anonymous.get('/api/ingredients/', {'name': 'Сахар'})
+        ingredient = Ingredient.objects.get(name='Сахар')
+        self.assertEqual(response.data, [{
+            'id': ingredient.id, 'name': 'Сахар', 'measurement_unit': 'г'}])
+
+    @override_settings(INGREDIENTS_SEARCH_LIMIT=2)
+    def test_limit(self):
+        self.assertEqual(self.search('соль'), ['Соль', 'соль поваренная'])
+        self.assertEqual(len(self.search('ingredient')), 2)
+
+    def test_search_without_queries(self):
+        self.search('соль')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search('морская'), ['Морская соль'])
+
+    def test_invalidated_on_save_and_delete(self):
+        self.assertEqual(self.search('перец'), [])
+        ingredient = Ingredient.objects.create(name='Перец',
+                                               measurement_unit='г')
+        self.assertEqual(self.search('перец'), ['Перец'])
+        ingredient.name = 'Перец чёрный'
+        ingredient.save()
+        self.assertEqual(self.search('перец'), ['Перец чёрный'])
+        ingredient.delete()
+        self.assertEqual(self.search('перец'), [])
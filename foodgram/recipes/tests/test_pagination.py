@@ -0,0 +1,67 @@
+from users.models import Follow
+
+from .base import FoodgramTestCase, create_user
+
+
+class PaginationTests(FoodgramTestCase):
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def names(self, data):
+        return [item['name'] for item in data['results']]
+
+    def test_page_number_contract(self):
+        data = self.get('/api/recipes/?page=2&limit=5')
+        self.assertEqual(list(data), ['count', 'next', 'previous',
+                                      'results'])
+        self.assertEqual(data['count'], 12)
+        self.assertEqual(self.names(data),
+                         [f'recipe{number}' for number in range(6, 1, -1)])
+        self.assertIn('page=3', data['next'])
+
+    def test_cursor_first_page(self):
+        data = self.get('/api/recipes/?cursor=&limit=5')
+        self.assertEqual(data['count'], 12)
+        self.assertIsNone(data['previous'])
+        self.assertIn('cursor=', data['next'])
+        self.assertEqual(self.names(data),
+                         [f'recipe{number}' for number in range(11, 6, -1)])
+
+    def test_cursor_follows_links(self):
+        data = self.get('/api/recipes/?cursor=&limit=5')
+        pages = [self.names(data)]
+        while data['next']:
+            data = self.get(data['next'])
+            pages.append(self.names(data))
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+        self.assertEqual(sum(pages, []),
+                         [f'recipe{number}' for number in range(11, -1, -1)])
+        previous = self.get(data['previous'])
+        self.assertEqual(self.names(previous), pages[1])
+
+    def test_cursor_without_count(self):
+        for value in ('0', 'false'):
+            with self.subTest(count=value):
+                data = self.get(f'/api/recipes/?cursor=&limit=5&count={value}')
+                self.assertNotIn('count', data)
+                self.assertEqual(len(data['results']), 5)
+
+    def test_cursor_without_count_skips_query(self):
+        with self.assertNumQueries(5):
+            self.get('/api/recipes/?page=1&limit=5')
+        with self.assertNumQueries(4):
+            self.get('/api/recipes/?cursor=&limit=5&count=0')
+
+    def test_subscriptions_cursor(self):
+        other = create_user('other')
+        Follow.objects.create(user=self.user, following=other)
+        data = self.get('/api/users/subscriptions/?cursor=&limit=1')
+        self.assertEqual(data['count'], 2)
+        self.assertEqual([item['id'] for item in data['results']],
+                         [other.id])
+        data = self.get(data['next'])
+        self.assertEqual([item['id'] for item in data['results']],
+                         [self.author.id])
+        self.assertIsNone(data['next'])
@@ -0,0 +1,41 @@
+import gzip
+import json
+
+from recipes.models import Tag
+
+from .base import FoodgramTestCase
+
+
+class CatalogPayloadTests(FoodgramTestCase):
+    def test_etag_differs_by_content_coding(self):
+        identity = self.anonymous.get('/api/tags/')
+        compressed = self.anonymous.get('/api/tags/',
+                                        HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotEqual(identity['ETag'], compressed['ETag'])
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(compressed.content)),
+                         json.loads(identity.content))
+        self.assertIn('Accept-Encoding', identity['Vary'])
+
+    def test_not_modified(self):
+        for encoding in ('', 'gzip'):
+            with self.subTest(encoding=encoding):
+                response = self.anonymous.get(
+                    '/api/ingredients/', HTTP_ACCEPT_ENCODING=encoding)
+                etag = response['ETag']
+                response = self.anonymous.get(
+                    '/api/ingredients/', HTTP_ACCEPT_ENCODING=encoding,
+                    HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+        identity = self.anonymous.get('/api/tags/')['ETag']
+        response = self.anonymous.get('/api/tags/',
+                                      HTTP_ACCEPT_ENCODING='gzip',
+                                      HTTP_IF_NONE_MATCH=identity)
+        self.assertEqual(response.status_code, 200)
+
+    def test_tag_change_invalidates_payload(self):
+        etag = self.anonymous.get('/api/tags/')['ETag']
+        Tag.objects.create(name='new', slug='new', color=Tag.GREEN)
+        response = self.anonymous.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), len(self.tags) + 1)
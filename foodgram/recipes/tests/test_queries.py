@@ -0,0 +1,33 @@
+from .base import FoodgramTestCase
+
+
+class QueryCountTests(FoodgramTestCase):
+    def test_recipe_list(self):
+        for limit in (1, 2, 6, 10, 50):
+            with self.subTest(limit=limit), self.assertNumQueries(5):
+                response = self.client.get(f'/api/recipes/?limit={limit}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']),
+                                 min(limit, self.recipes_count))
+
+    def test_anonymous_recipe_list(self):
+        for limit in (2, 10, 50):
+            with self.subTest(limit=limit), self.assertNumQueries(4):
+                response = self.anonymous.get(f'/api/recipes/?limit={limit}')
+                self.assertEqual(response.status_code, 200)
+
+    def test_recipe_detail(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/recipes/{self.recipes[0].id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['ingredients']), 3)
+
+    def test_subscriptions(self):
+        for limit in (1, 2, 10):
+            with self.subTest(limit=limit), self.assertNumQueries(3):
+                response = self.client.get(
+                    f'/api/users/subscriptions/?limit={limit}'
+                    f'&recipes_limit={limit}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results'][0]['recipes']),
+                                 min(limit, self.recipes_count // 2))
@@ -0,0 +1,16 @@
+from unittest import skipUnless
+
+from django.db import connection
+from recipes.explain import explain, get_api_querysets, iter_seq_scans
+
+from .base import FoodgramTestCase
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN требует PostgreSQL')
+class QueryPlanTests(FoodgramTestCase):
+    def test_api_queries_use_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        for name, queryset in get_api_querysets(self.user).items():
+            with self.subTest(query=name):
+                self.assertEqual(list(iter_seq_scans(explain(queryset))), [])
@@ -0,0 +1,105 @@
+from unittest import mock
+
+from recipes.models import Recipe
+from recipes.response_cache import recipes_cache
+
+from .base import PNG, FoodgramTestCase, TemporaryMediaMixin
+
+
+class RecipeWriteTests(TemporaryMediaMixin, FoodgramTestCase):
+    def get_data(self, **kwargs):
+        data = {
+            'ingredients': [{'id': ingredient.id, 'amount': 10}
+                            for ingredient in self.ingredients],
+            'tags': [tag.id for tag in self.tags[:2]],
+            'image': f'data:image/png;base64,{PNG}',
+            'name': 'new recipe',
+            'text': 'text',
+            'cooking_time': 10,
+        }
+        data.update(kwargs)
+        return data
+
+    def test_create(self):
+        with self.assertNumQueries(8):
+            response = self.client.post('/api/recipes/', self.get_data(),
+                                        format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        recipe = Recipe.objects.get(id=response.data['id'])
+        self.assertEqual(recipe.recipeingredient_set.count(),
+                         len(self.ingredients))
+        self.assertEqual(recipe.tags.count(), 2)
+
+    def test_update_replaces_relations(self):
+        recipe = self.recipes[0]
+        response = self.client.patch(
+            f'/api/recipes/{recipe.id}/',
+            self.get_data(ingredients=[
+                {'id': self.ingredients[4].id, 'amount': 3}],
+                tags=[self.tags[2].id]),
+            format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            list(recipe.recipeingredient_set.values_list(
+                'ingredient_id', 'amount')),
+            [(self.ingredients[4].id, 3)])
+        self.assertEqual(list(recipe.tags.all()), [self.tags[2]])
+
+    def test_write_invalidates_cache_once(self):
+        recipe = self.recipes[0]
+        with mock.patch.object(recipes_cache, 'bump_generation') as bump, \
+                mock.patch('recipes.images.executor'):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    f'/api/recipes/{recipe.id}/', self.get_data(),
+                    format='json')
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertEqual(bump.call_count, 1)
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.delete(f'/api/recipes/{recipe.id}/')
+            self.assertEqual(response.status_code, 204)
+            self.assertEqual(bump.call_count, 2)
+
+    def test_write_refreshes_search_vector_once(self):
+        recipe = self.recipes[0]
+        with mock.patch('recipes.signals.update_search_vector') as update, \
+                mock.patch('recipes.images.executor'):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    f'/api/recipes/{recipe.id}/', self.get_data(),
+                    format='json')
+            self.assertEqual(response.status_code, 200, response.data)
+            update.assert_called_once_with([recipe.id])
+            with self.captureOnCommitCallbacks(execute=True):
+                recipe.save(update_fields=['thumbnail'])
+                self.client.delete(f'/api/recipes/{recipe.id}/')
+            update.assert_called_once()
+
+    def test_invalid_ingredients(self):
+        ingredient = self.ingredients[0].id
+        for ingredients in (
+            [],
+            [{'id': ingredient, 'amount': 1}, {'id': ingredient, 'amount': 2}],
+            [{'id': ingredient, 'amount': 0}],
+            [{'id': 9999, 'amount': 1}],
+        ):
+            with self.subTest(ingredients=ingredients):
+                response = self.client.post(
+                    '/api/recipes/', self.get_data(ingredients=ingredients),
+                    format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('ingredients', response.data)
+
+    def test_invalid_tags(self):
+        for tags in ([], [9999]):
+            with self.subTest(tags=tags):
+                response = self.client.post(
+                    '/api/recipes/', self.get_data(tags=tags), format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('tags', response.data)
+
+    def test_invalid_data_creates_nothing(self):
+        count = Recipe.objects.count()
+        self.client.post('/api/recipes/', self.get_data(
+            ingredients=[{'id': 9999, 'amount': 1}]), format='json')
+        self.assertEqual(Recipe.objects.count(), count)
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from foodgram.metrics import registry
+from recipes.response_cache import recipes_cache
+from rest_framework.request import Request
+
+from .base import FoodgramTestCase
+
+
+class ResponseCacheTests(FoodgramTestCase):
+    def test_anonymous_list_is_cached(self):
+        first = self.anonymous.get('/api/recipes/')
+        second = self.anonymous.get('/api/recipes/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.json(), second.json())
+
+    def test_authenticated_list_is_not_cached(self):
+        response = self.client.get('/api/recipes/')
+        self.assertFalse(response.has_header('X-Cache'))
+
+    def test_recipe_change_invalidates(self):
+        self.anonymous.get('/api/recipes/')
+        recipe = self.recipes[-1]
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.name = 'renamed'
+            recipe.save()
+        response = self.anonymous.get('/api/recipes/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        names = [item['name'] for item in response.json()['results']]
+        self.assertIn('renamed', names)
+
+    def test_foreign_lock_is_kept(self):
+        request = Request(
+            self.anonymous.get('/api/recipes/').wsgi_request)
+        recipes_cache.cache.clear()
+        lock_key = f'{recipes_cache.make_key(request)}:lock'
+        recipes_cache.cache.set(lock_key, 1)
+        with mock.patch.object(recipes_cache, 'max_wait', 0):
+            response = self.anonymous.get('/api/recipes/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(recipes_cache.cache.get(lock_key), 1)
+
+    def test_outcomes_are_exported(self):
+        self.anonymous.get('/api/recipes/')
+        self.anonymous.get('/api/recipes/')
+        samples = registry.collect()
+        for result in ('hit', 'miss'):
+            labels = (('cache', 'recipes'), ('result', result))
+            with self.subTest(result=result):
+                self.assertGreaterEqual(
+                    samples[('foodgram_response_cache_total', labels)], 1)
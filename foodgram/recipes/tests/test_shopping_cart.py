@@ -0,0 +1,35 @@
+from .base import FoodgramTestCase
+
+
+class DownloadShoppingCartTests(FoodgramTestCase):
+    url = '/api/recipes/download_shopping_cart/'
+
+    def test_formats(self):
+        for query, accept, content_type in (
+            ('', '*/*', 'text/plain'),
+            ('?format=txt', '*/*', 'text/plain'),
+            ('?format=csv', '*/*', 'text/csv'),
+            ('?format=json', '*/*', 'application/json'),
+            ('', 'application/json', 'application/json'),
+            ('', 'text/csv', 'text/csv'),
+        ):
+            with self.subTest(query=query, accept=accept):
+                response = self.client.get(self.url + query,
+                                           HTTP_ACCEPT=accept)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(
+                    response['Content-Type'].startswith(content_type))
+
+    def test_content(self):
+        response = self.client.get(self.url)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'ingredient0 - 22 g ')
+        self.assertEqual(len(lines), 3)
+
+    def test_errors_are_not_python_repr(self):
+        response = self.anonymous.get(self.url)
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn(b'ErrorDetail', response.content)
+        response = self.client.get(self.url + '?format=xml')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn(b'ErrorDetail', response.content)
@@ -1,7 +1,8 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import IngredientsViewSet, RecipeViewSet, TagsViewSet
+from .views import (IngredientsViewSet, RecipeViewSet,
+                    ShoppingListExportViewSet, TagsViewSet)
 
 router = DefaultRouter()
 
@@ -9,6 +10,8 @@ router.register('ingredients', IngredientsViewSet,
                 basename='ingredients')
 router.register('tags', TagsViewSet, basename='tags')
 router.register('recipes', RecipeViewSet, basename='recipes')
+router.register('shopping_list_exports', ShoppingListExportViewSet,
+                basename='shopping_list_exports')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,31 +1,67 @@
-from django.http.response import HttpResponse
+import csv
+import json
+
+from django.db.models import Sum
+from django.http.response import StreamingHttpResponse
 
 from .models import RecipeIngredient
 
 
-def get_ingredients_list(recipes_list):
-    ingredients_dict = {}
-    for recipe in recipes_list:
-        ingredients = RecipeIngredient.objects.filter(recipe=recipe.recipe)
-        for ingredient in ingredients:
-            amount = ingredient.amount
-            name = ingredient.ingredient.name
-            measurement_unit = ingredient.ingredient.measurement_unit
-            if name not in ingredients_dict:
-                ingredients_dict[name] = {
-                    'measurement_unit': measurement_unit,
-                    'amount': amount
-                }
-            else:
-                ingredients_dict[name]['amount'] += amount
-    to_buy = []
-    for item in ingredients_dict:
-        to_buy.append(f'{item} - {ingredients_dict[item]["amount"]} '
-                      f'{ingredients_dict[item]["measurement_unit"]} \n')
-    return to_buy
-
-
-def download_file_response(list_to_download, filename):
-    response = HttpResponse(list_to_download, 'Content-Type: text/plain')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+class Echo:
+    def write(self, value):
+        return value
+
+
+def get_ingredients_list(user):
+    return RecipeIngredient.objects.filter(
+        recipe__shoppinglist__user=user
+    ).values(
+        'ingredient__name', 'ingredient__measurement_unit'
+    ).annotate(
+        amount=Sum('amount')
+    ).order_by('ingredient__name')
+
+
+def ingredients_to_txt(ingredients):
+    for item in ingredients.iterator():
+        yield (f'{item["ingredient__name"]} - {item["amount"]} '
+               f'{item["ingredient__measurement_unit"]} \n')
+
+
+def ingredients_to_csv(ingredients):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'amount', 'measurement_unit'))
+    for item in ingredients.iterator():
+        yield writer.writerow((item['ingredient__name'], item['amount'],
+                               item['ingredient__measurement_unit']))
+
+
+def ingredients_to_json(ingredients):
+    yield '['
+    separator = ''
+    for item in ingredients.iterator():
+        yield separator + json.dumps({
+            'name': item['ingredient__name'],
+            'amount': item['amount'],
+            'measurement_unit': item['ingredient__measurement_unit']
+        }, ensure_ascii=False)
+        separator = ','
+    yield ']'
+
+
+SHOPPING_LIST_FORMATS = {
+    'txt': (ingredients_to_txt, 'text/plain'),
+    'csv': (ingredients_to_csv, 'text/csv'),
+    'json': (ingredients_to_json, 'application/json'),
+}
+
+
+def download_file_response(ingredients, filename, file_format='txt'):
+    to_lines, content_type = SHOPPING_LIST_FORMATS[file_format]
+    response = StreamingHttpResponse(
+        to_lines(ingredients),
+        content_type=f'{content_type}; charset=utf-8'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{file_format}"')
     return response
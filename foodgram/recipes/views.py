@@ -1,18 +1,34 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch
+from django.http import FileResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from .counters import refresh_counters
+from .exports import create_export
 from .filters import IngredientsFilter, RecipeFilter
-from .mixins import RetriveAndListViewSet
-from .models import Favorite, Ingredient, Recipe, ShoppingList, Tag
+from .ingredient_index import ingredient_index
+from .mixins import (AnonymousCacheMixin, CreateAndRetrieveViewSet,
+                     RetriveAndListViewSet)
+from .models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                     ShoppingList, ShoppingListExport, Tag)
 from .pagination import CustomPageNumberPaginator
+from .payloads import (cached_payload_response, ingredients_payload,
+                       tags_payload)
 from .permissions import IsAuthorOrAdmin
-from .serializers import (AddRecipeSerializer, FavouriteSerializer,
-                          IngredientsSerializer, ShoppingListSerializer,
-                          ShowRecipeFullSerializer, TagsSerializer)
+from .renderers import CSVRenderer, PlainTextRenderer
+from .serializers import (AddRecipeSerializer, BulkIdsSerializer,
+                          FavouriteSerializer,
+                          IngredientsSerializer,
+                          ShoppingListExportSerializer,
+                          ShoppingListSerializer, ShowRecipeFullSerializer,
+                          ShowRecipeSerializer, TagsSerializer)
 from .utils import download_file_response, get_ingredients_list
 
 User = get_user_model()
@@ -26,6 +42,13 @@ class IngredientsViewSet(RetriveAndListViewSet):
     filterset_class = IngredientsFilter
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            return cached_payload_response(request, ingredients_payload)
+        return Response(ingredient_index.search(
+            name, settings.INGREDIENTS_SEARCH_LIMIT))
+
 
 class TagsViewSet(RetriveAndListViewSet):
     queryset = Tag.objects.all()
@@ -33,14 +56,38 @@ class TagsViewSet(RetriveAndListViewSet):
     permission_classes = [permissions.AllowAny]
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        return cached_payload_response(request, tags_payload)
+
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(AnonymousCacheMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all().order_by('-id')
     serializer_class = ShowRecipeFullSerializer
     permission_classes = [IsAuthorOrAdmin]
     filter_backends = [DjangoFilterBackend]
     filterset_class = RecipeFilter
     pagination_class = CustomPageNumberPaginator
+    primary_db_actions = ('favorite', 'shopping_cart')
+
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related(
+            'author'
+        ).prefetch_related(
+            'tags',
+            Prefetch(
+                'recipeingredient_set',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            ),
+        )
+        user = self.request.user
+        if user.is_anonymous:
+            return queryset
+        return queryset.annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+            is_in_shopping_cart=Exists(ShoppingList.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+        )
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -82,8 +129,70 @@ class RecipeViewSet(viewsets.ModelViewSet):
         shopping_list.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    @action(detail=False, permission_classes=[permissions.IsAuthenticated])
+    def bulk_add(self, request, model):
+        serializer = BulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        recipes = Recipe.objects.annotate(added=Exists(model.objects.filter(
+            user=request.user, recipe=OuterRef('pk')))).in_bulk(ids)
+        new_ids = [pk for pk in ids if pk in recipes and not recipes[pk].added]
+        if new_ids:
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    [model(user=request.user, recipe_id=pk) for pk in new_ids],
+                    ignore_conflicts=True)
+                refresh_counters(model, new_ids)
+        results = []
+        for pk in ids:
+            if pk not in recipes:
+                results.append({'id': pk, 'status': 'not_found'})
+                continue
+            results.append({
+                'id': pk,
+                'status': 'exists' if recipes[pk].added else 'created',
+                'recipe': ShowRecipeSerializer(
+                    recipes[pk], context={'request': request}).data,
+            })
+        return Response(results)
+
+    @action(detail=False, methods=['post'], url_path='favorite',
+            permission_classes=[permissions.IsAuthenticated])
+    def bulk_favorite(self, request):
+        return self.bulk_add(request, Favorite)
+
+    @action(detail=False, methods=['post'], url_path='shopping_cart',
+            permission_classes=[permissions.IsAuthenticated])
+    def bulk_shopping_cart(self, request):
+        return self.bulk_add(request, ShoppingList)
+
+    @action(detail=False, permission_classes=[permissions.IsAuthenticated],
+            renderer_classes=[PlainTextRenderer, CSVRenderer, JSONRenderer])
     def download_shopping_cart(self, request):
-        user_shopping_list = request.user.shopping_list.all()
-        to_buy = get_ingredients_list(user_shopping_list)
-        return download_file_response(to_buy, 'to_buy.txt')
+        to_buy = get_ingredients_list(request.user)
+        return download_file_response(to_buy, 'to_buy',
+                                      request.accepted_renderer.format)
+
+
+class ShoppingListExportViewSet(CreateAndRetrieveViewSet):
+    serializer_class = ShoppingListExportSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return self.request.user.shopping_list_exports.all()
+
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = create_export(request.user,
+                            serializer.validated_data['file_format'])
+        return Response(self.get_serializer(job).data,
+                        status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True)
+    def download(self, request, pk):
+        job = self.get_object()
+        if job.status != ShoppingListExport.DONE:
+            return Response(self.get_serializer(job).data,
+                            status=status.HTTP_409_CONFLICT)
+        return FileResponse(job.file.open('rb'), as_attachment=True,
+                            filename=f'to_buy.{job.file_format}')
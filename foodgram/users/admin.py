@@ -9,7 +9,8 @@ User = get_user_model()
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
-    list_display = ('pk', 'email', 'username')
+    list_display = ('pk', 'email', 'username', 'recipes_count',
+                    'followers_count')
     list_filter = ('email', 'username')
 
 
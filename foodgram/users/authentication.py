@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from foodgram.caches import is_shared_cache
+from foodgram.metrics import registry
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+User = get_user_model()
+
+USER_FIELDS = [
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in ('id', 'email', 'username', 'first_name',
+                         'last_name', 'is_active', 'is_staff', 'is_superuser')
+]
+
+auth_cache_total = registry.counter(
+    'foodgram_auth_token_cache_total',
+    'Token lookups served from the authentication cache.', ('result',))
+
+
+class TokenCache:
+    def __init__(self, alias, max_size, ttl, sync_interval=1):
+        self.alias = alias
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hit': 0, 'miss': 0}
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def enabled(self):
+        return is_shared_cache(self.alias)
+
+    def count(self, outcome):
+        self.counters[outcome] += 1
+        auth_cache_total.inc(result=outcome)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters, size=len(self.entries))
+        total = stats['hit'] + stats['miss']
+        stats['hit_rate'] = stats['hit'] / total if total else 0
+        return stats
+
+    @staticmethod
+    def revoked_key(key):
+        return f'token-revoked:{key}'
+
+    @staticmethod
+    def generation_key(user_id):
+        return f'token-user-generation:{user_id}'
+
+    def is_revoked(self, key, user_id, generation):
+        names = [self.revoked_key(key), self.generation_key(user_id)]
+        values = self.cache.get_many(names)
+        return names[0] in values or values.get(names[1], 0) != generation
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry is not None and entry[0] >= now and (
+                now - entry[4] >= self.sync_interval):
+            if self.is_revoked(key, entry[1], entry[3]):
+                entry = None
+            else:
+                entry = entry[:4] + (now,)
+        with self._lock:
+            if entry is None or entry[0] < now:
+                self.entries.pop(key, None)
+                self.count('miss')
+                return None
+            if key in self.entries:
+                self.entries[key] = entry
+                self.entries.move_to_end(key)
+            self.count('hit')
+            values = entry[2]
+        user = User.from_db(DEFAULT_DB_ALIAS, USER_FIELDS, values)
+        return user, Token(key=key, user=user)
+
+    def set(self, key, user):
+        if not self.enabled:
+            return
+        values = [getattr(user, name) for name in USER_FIELDS]
+        generation = self.cache.get(self.generation_key(user.pk), 0)
+        now = time.monotonic()
+        with self._lock:
+            self.entries[key] = (now + self.ttl, user.pk, values, generation,
+                                 now)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.entries.pop(key, None)
+        self.cache.set(self.revoked_key(key), True, self.ttl)
+
+    def invalidate_user(self, user_id):
+        if not self.enabled:
+            return
+        with self._lock:
+            for key, entry in list(self.entries.items()):
+                if entry[1] == user_id:
+                    del self.entries[key]
+        try:
+            self.cache.incr(self.generation_key(user_id))
+        except ValueError:
+            self.cache.set(self.generation_key(user_id), 1, None)
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE,
+                         settings.AUTH_TOKEN_CACHE_SIZE,
+                         settings.AUTH_TOKEN_CACHE_TTL)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        credentials = token_cache.get(key)
+        if credentials is not None:
+            return credentials
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user)
+        return user, token
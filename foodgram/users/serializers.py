@@ -1,11 +1,13 @@
 from django.contrib.auth import get_user_model
 from djoser.serializers import UserCreateSerializer, UserSerializer
+from foodgram.timing import TimedSerializerMixin
 from recipes.models import Recipe
 from rest_framework.serializers import (ModelSerializer,
                                         PrimaryKeyRelatedField,
                                         SerializerMethodField, ValidationError)
 
 from .models import Follow
+from .utils import get_subscribed_ids
 
 User = get_user_model()
 
@@ -22,7 +24,7 @@ class UserRegistrationSerializer(UserCreateSerializer):
         )
 
 
-class CustomUserSerializer(UserSerializer):
+class CustomUserSerializer(TimedSerializerMixin, UserSerializer):
     is_subscribed = SerializerMethodField(read_only=True)
 
     class Meta():
@@ -40,8 +42,7 @@ class CustomUserSerializer(UserSerializer):
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
-        return Follow.objects.filter(user=self.context['request'].user,
-                                     following=obj).exists()
+        return obj.id in get_subscribed_ids(request)
 
 
 class FollowSerializer(ModelSerializer):
@@ -71,11 +72,10 @@ class FollowingRecipesSerializers(ModelSerializer):
         fields = ('id', 'name', 'image', 'cooking_time')
 
 
-class ShowFollowSerializer(ModelSerializer):
+class ShowFollowSerializer(TimedSerializerMixin, ModelSerializer):
 
     is_subscribed = SerializerMethodField()
     recipes = SerializerMethodField()
-    recipes_count = SerializerMethodField()
 
     class Meta:
         model = User
@@ -87,18 +87,19 @@ class ShowFollowSerializer(ModelSerializer):
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
-        return obj.follower.filter(user=obj, following=request.user).exists()
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+        return obj.id in get_subscribed_ids(request)
 
     def get_recipes(self, obj):
         request = self.context.get('request')
-        recipes_limit = request.query_params.get('recipes_limit')
-        if recipes_limit is not None:
-            recipes = obj.recipes.all()[:(int(recipes_limit))]
-        else:
-            recipes = obj.recipes.all()
+        recipes = getattr(obj, 'limited_recipes', None)
+        if recipes is None:
+            recipes_limit = request.query_params.get('recipes_limit')
+            if recipes_limit is not None:
+                recipes = obj.recipes.all()[:(int(recipes_limit))]
+            else:
+                recipes = obj.recipes.all()
         context = {'request': request}
         return FollowingRecipesSerializers(recipes, many=True,
                                            context=context).data
-
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
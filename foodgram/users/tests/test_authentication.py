@@ -0,0 +1,132 @@
+import tempfile
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from users.authentication import TokenCache, token_cache
+from users.models import User
+
+
+class TokenAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', username='user', first_name='user',
+            last_name='user', password='password')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'recipes': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': directory.name,
+            },
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+        token_cache.entries.clear()
+        self.client = APIClient()
+        response = self.client.post('/api/auth/token/login/', {
+            'email': 'user@example.com', 'password': 'password'})
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {response.data["auth_token"]}')
+
+    def get_me(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/me/')
+        return response, len(queries)
+
+    def test_cached_lookup_skips_token_query(self):
+        response, first = self.get_me()
+        self.assertEqual(response.status_code, 200)
+        response, second = self.get_me()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['email'], 'user@example.com')
+        self.assertEqual(second, first - 1)
+
+    def test_cached_user_is_partial(self):
+        self.get_me()
+        key = next(iter(token_cache.entries))
+        user, token = token_cache.get(key)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertIn('recipes_count', user.get_deferred_fields())
+        self.assertIn('password', user.get_deferred_fields())
+
+    def test_logout_revokes_token(self):
+        self.get_me()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/token/logout/')
+        self.assertEqual(response.status_code, 204)
+        response, _ = self.get_me()
+        self.assertEqual(response.status_code, 401)
+
+    def test_deactivation_revokes_token(self):
+        self.get_me()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        response, _ = self.get_me()
+        self.assertEqual(response.status_code, 401)
+
+    def test_password_change_evicts_user(self):
+        self.get_me()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/users/set_password/', {
+                'current_password': 'password',
+                'new_password': 'Xq7-long-password',
+            })
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(token_cache.entries, {})
+
+    def test_registration_keeps_entries(self):
+        self.get_me()
+        entries = dict(token_cache.entries)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = APIClient().post('/api/users/', {
+                'email': 'new@example.com', 'username': 'new',
+                'first_name': 'new', 'last_name': 'new',
+                'password': 'Xq7-long-password',
+            })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(token_cache.entries, entries)
+
+    def test_revocation_reaches_other_workers(self):
+        other = User.objects.create_user(
+            email='other@example.com', username='other', first_name='other',
+            last_name='other', password='password')
+        worker = TokenCache('recipes', 10, 60, sync_interval=0)
+        worker.set('user-key', self.user)
+        worker.set('other-key', other)
+        token_cache.invalidate('user-key')
+        self.assertIsNone(worker.get('user-key'))
+        self.assertEqual(worker.get('other-key')[0].pk, other.pk)
+        token_cache.invalidate_user(other.pk)
+        self.assertIsNone(worker.get('other-key'))
+        worker.set('other-key', other)
+        self.assertEqual(worker.get('other-key')[0].pk, other.pk)
+
+    def test_process_local_cache_is_not_used(self):
+        with override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'recipes': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+        }):
+            self.assertFalse(token_cache.enabled)
+            response, first = self.get_me()
+            self.assertEqual(response.status_code, 200)
+            response, second = self.get_me()
+            self.assertEqual(second, first)
+            self.assertEqual(token_cache.entries, {})
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post('/api/auth/token/logout/')
+            response, _ = self.get_me()
+            self.assertEqual(response.status_code, 401)
@@ -0,0 +1,54 @@
+from recipes.tests.base import FoodgramTestCase, create_user
+
+
+class IsSubscribedTests(FoodgramTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = create_user('other')
+
+    def get_flags(self, url, client=None):
+        response = (client or self.client).get(url)
+        self.assertEqual(response.status_code, 200)
+        return {item['id']: item['is_subscribed']
+                for item in response.data['results']}
+
+    def get_author_flags(self, client=None):
+        response = (client or self.client).get('/api/recipes/?limit=50')
+        self.assertEqual(response.status_code, 200)
+        return {item['author']['id']: item['author']['is_subscribed']
+                for item in response.data['results']}
+
+    def test_users_list(self):
+        self.assertEqual(self.get_flags('/api/users/'), {
+            self.user.id: False, self.author.id: True, self.other.id: False})
+        self.assertEqual(
+            set(self.get_flags('/api/users/', self.anonymous).values()),
+            {False})
+
+    def test_user_detail(self):
+        for user, expected in ((self.author, True), (self.other, False)):
+            with self.subTest(user=user.username):
+                response = self.client.get(f'/api/users/{user.id}/')
+                self.assertEqual(response.data['is_subscribed'], expected)
+
+    def test_recipe_authors(self):
+        self.assertEqual(self.get_author_flags(),
+                         {self.user.id: False, self.author.id: True})
+        self.assertEqual(set(self.get_author_flags(self.anonymous).values()),
+                         {False})
+        response = self.client.get(f'/api/recipes/{self.recipes[1].id}/')
+        self.assertTrue(response.data['author']['is_subscribed'])
+        response = self.client.get(f'/api/recipes/{self.recipes[0].id}/')
+        self.assertFalse(response.data['author']['is_subscribed'])
+
+    def test_follow_changes_flags(self):
+        self.client.force_authenticate(self.author)
+        self.assertEqual(self.get_author_flags(),
+                         {self.user.id: False, self.author.id: False})
+        response = self.client.get(f'/api/users/{self.user.id}/subscribe/')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.get_author_flags(),
+                         {self.user.id: True, self.author.id: False})
+        self.assertEqual(self.get_flags('/api/users/'), {
+            self.user.id: True, self.author.id: False, self.other.id: False})
@@ -0,0 +1,9 @@
+from .models import Follow
+
+
+def get_subscribed_ids(request):
+    if not hasattr(request, 'subscribed_ids'):
+        request.subscribed_ids = set(Follow.objects.filter(
+            user=request.user
+        ).values_list('following_id', flat=True))
+    return request.subscribed_ids
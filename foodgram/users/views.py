@@ -1,7 +1,16 @@
+from collections import defaultdict
+
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import BooleanField, Exists, F, OuterRef, Value, Window
+from django.db.models.functions import RowNumber
 from django.shortcuts import get_object_or_404
+from recipes.counters import refresh_counters
+from recipes.models import Recipe
 from recipes.pagination import CustomPageNumberPaginator
+from recipes.serializers import BulkIdsSerializer
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
@@ -13,6 +22,7 @@ User = get_user_model()
 
 class FollowApiView(APIView):
     permission_classes = [permissions.IsAuthenticated, ]
+    primary_db_actions = ('get',)
 
     def get(self, request, id):
         data = {'user': request.user.id, 'following': id}
@@ -30,6 +40,39 @@ class FollowApiView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class BulkFollowApiView(APIView):
+    permission_classes = [permissions.IsAuthenticated, ]
+
+    def post(self, request):
+        serializer = BulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        authors = User.objects.annotate(subscribed=Exists(
+            Follow.objects.filter(user=request.user, following=OuterRef('pk'))
+        )).only('id').in_bulk(ids)
+        new_ids = [pk for pk in ids if pk in authors and pk != request.user.id
+                   and not authors[pk].subscribed]
+        if new_ids:
+            with transaction.atomic():
+                Follow.objects.bulk_create(
+                    [Follow(user=request.user, following_id=pk)
+                     for pk in new_ids],
+                    ignore_conflicts=True)
+                refresh_counters(Follow, new_ids)
+        results = []
+        for pk in ids:
+            if pk not in authors:
+                results.append({'id': pk, 'status': 'not_found'})
+            elif pk == request.user.id:
+                results.append({'id': pk, 'status': 'invalid',
+                                'errors': 'Нельзя подписаться на себя'})
+            elif authors[pk].subscribed:
+                results.append({'id': pk, 'status': 'exists'})
+            else:
+                results.append({'id': pk, 'status': 'created'})
+        return Response(results)
+
+
 class ListFollowViewSet(generics.ListAPIView):
     queryset = User.objects.all()
     permission_classes = [permissions.IsAuthenticated, ]
@@ -38,4 +81,50 @@ class ListFollowViewSet(generics.ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return User.objects.filter(following__user=user)
+        return User.objects.filter(following__user=user).annotate(
+            is_subscribed=Value(True, output_field=BooleanField())
+        ).order_by('-id')
+
+    def get_recipes_limit(self):
+        recipes_limit = self.request.query_params.get('recipes_limit')
+        if recipes_limit is None:
+            return None
+        try:
+            recipes_limit = int(recipes_limit)
+        except ValueError:
+            recipes_limit = -1
+        if recipes_limit < 0:
+            raise ValidationError({
+                'recipes_limit': 'Ожидается неотрицательное целое число'})
+        return recipes_limit
+
+    def add_recipes(self, authors):
+        recipes_limit = self.get_recipes_limit()
+        recipes = Recipe.objects.filter(author__in=authors)
+        if recipes_limit is not None:
+            ranked = recipes.annotate(row_number=Window(
+                expression=RowNumber(),
+                partition_by=[F('author_id')],
+                order_by=F('id').desc()
+            )).order_by()
+            sql, params = ranked.query.sql_with_params()
+            recipes = Recipe.objects.raw(
+                f'SELECT * FROM ({sql}) ranked '
+                'WHERE row_number <= %s ORDER BY id DESC',
+                (*params, recipes_limit)
+            )
+        authors_recipes = defaultdict(list)
+        for recipe in recipes:
+            authors_recipes[recipe.author_id].append(recipe)
+        for author in authors:
+            author.limited_recipes = authors_recipes[author.id]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        authors = list(queryset) if page is None else page
+        self.add_recipes(authors)
+        serializer = self.get_serializer(authors, many=True)
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)